@@ -0,0 +1,122 @@
+import os
+import sys
+import json
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+from catalog import get_catalog
+from cpp_tree import CPPTree
+from helpers import Error
+
+# parses and validates many example.cpp files in parallel, e.g. to check a corpus of examples after changing possible_solver_combinations
+# run it from this directory (like gui.py): python3 batch.py -j 8 -o results.json ../../opendihu/examples
+# the catalog is built (or loaded from its disk cache) before the workers get started
+# workers that are forked (the default on linux) inherit it, workers that are spawned (macos and windows) load it from the disk cache once when they start
+
+
+# returns the list of .cpp files in paths (directories are searched recursively), sorted in each directory
+def find_cpp_files(paths):
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for (directory, directories, names) in os.walk(path):
+                directories.sort()
+                for name in sorted(names):
+                    if name.endswith('.cpp'):
+                        files.append(os.path.join(directory, name))
+        else:
+            files.append(path)
+    return files
+
+
+def message_to_dict(message):
+    return {'type': message.prefix, 'message': message.message}
+
+
+# parses and validates the file at path with a new CPPTree
+# returns a dict that can be converted to json:
+#   path, ok (no Errors), parse and validation (lists of messages) and the times in seconds
+def parse_and_validate_file(path):
+    result = {'path': path, 'ok': False, 'parse': [], 'validation': [], 'times': {}}
+    start = time.perf_counter()
+    try:
+        file = open(path, "r")
+        src = file.read()
+        file.close()
+    except Exception as e:
+        result['parse'] = [{'type': 'Error', 'message': 'failed to read ' + path + ' (' + str(e) + ')'}]
+        return result
+    result['times']['read'] = time.perf_counter() - start
+
+    cpp_tree = CPPTree()
+    cpp_tree.load_empty_simulation()
+    start = time.perf_counter()
+    messages = cpp_tree.parse_cpp_src(src)
+    result['times']['parse'] = time.perf_counter() - start
+    result['parse'] = [message_to_dict(message) for message in messages]
+
+    errors = [message for message in messages if isinstance(message, Error)]
+    if not errors:
+        start = time.perf_counter()
+        errors = cpp_tree.undo_stack.get_current_root().validate_cpp_src_recursive()
+        result['times']['validate'] = time.perf_counter() - start
+        result['validation'] = [message_to_dict(error) for error in errors]
+    result['ok'] = len(errors) == 0
+    return result
+
+
+# calls function(path) for all paths with jobs processes (all cpus if jobs is None)
+# returns the results in the order of paths
+# function has to be a module level function, so it can be sent to the workers
+def map_files(function, paths, jobs=None):
+    # build (or load) the catalog before the workers get started
+    get_catalog()
+    if jobs == None:
+        jobs = os.cpu_count() or 1
+    jobs = max(1, min(jobs, len(paths)))
+    if jobs == 1:
+        return [function(path) for path in paths]
+    # send the paths in chunks, so the workers don't have to wait for every single path
+    chunksize = max(1, len(paths) // (jobs * 4))
+    with ProcessPoolExecutor(max_workers=jobs, initializer=get_catalog) as executor:
+        return list(executor.map(function, paths, chunksize=chunksize))
+
+
+# parses and validates all files in paths with jobs processes (all cpus if jobs is None)
+# returns the results of parse_and_validate_file() in the order of paths
+def parse_and_validate_files(paths, jobs=None):
+    return map_files(parse_and_validate_file, paths, jobs)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='parse and validate example.cpp files in parallel and print the results as json')
+    parser.add_argument('paths', nargs='+', help='.cpp files or directories that get searched for .cpp files')
+    parser.add_argument('-j', '--jobs', type=int, default=None, help='number of processes (default: number of cpus)')
+    parser.add_argument('-o', '--output', default=None, help='write the json to this file instead of stdout')
+    args = parser.parse_args(argv)
+
+    files = find_cpp_files(args.paths)
+    start = time.perf_counter()
+    results = parse_and_validate_files(files, args.jobs)
+    duration = time.perf_counter() - start
+
+    output = {
+        'files': results,
+        'summary': {
+            'files': len(results),
+            'failed': len([result for result in results if not result['ok']]),
+            'time': duration,
+        },
+    }
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(output, file, indent=2)
+    else:
+        json.dump(output, sys.stdout, indent=2)
+        print()
+    # exit status 1 if a file has errors
+    return 0 if output['summary']['failed'] == 0 else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,204 @@
+import sys
+import time
+import tracemalloc
+
+from cpp_tree import CPPTree
+from python_settings.python_settings import PythonSettings, SettingsDict
+
+# benchmarks for the backend, run them with: python3 benchmark.py
+# they print the time needed for typical operations on large generated inputs
+
+
+# returns the source of a main() with about lines lines
+# half of the lines are code and comments before the problem, the other half is the problem with a comment on every line
+def generate_cpp_src(lines):
+    src = '#include "opendihu.h"\n\nint main(int argc, char *argv[])\n{\n'
+    for i in range(lines // 4):
+        src += '  // some comment about the variable ' + str(i) + '\n'
+        src += '  int variable' + str(i) + ' = ' + str(i) + ';  // another comment\n'
+    src += '  DihuContext settings(argc, argv);\n'
+    src += '  Control::Coupling<\n'
+    # every instance has 8 lines
+    instances = max(1, lines // 16)
+    for i in range(instances):
+        src += '    // instance ' + str(i) + ', this comment is quite long so the comments add up to a lot of text\n'
+        src += '    Control::MultipleInstances<  // multiple instances\n'
+        src += '      TimeSteppingScheme::Heun<  // time stepping\n'
+        src += '        CellmlAdapter<4, 9>  // cellml\n'
+        src += '      >\n'
+        src += '    >'
+        if i < instances - 1:
+            src += ',\n'
+        else:
+            src += '\n'
+    src += '  > problem(settings);\n'
+    src += '  problem.run();\n  return EXIT_SUCCESS;\n}\n'
+    return src
+
+
+# returns the source of a settings.py with about entries entries in its config
+# it looks like the fiber meshes and mappings of user-study/aufgabe3.py, repeated until there are enough entries
+def generate_python_settings(entries):
+    src = '# generated settings\nimport sys\n\nconfig = {\n  "scenarioName": "benchmark",  # name of the scenario\n  "Meshes": {\n'
+    # every fiber has 8 entries
+    fibers = max(1, entries // 8)
+    for i in range(fibers):
+        src += '    "MeshFiber_' + str(i) + '": {  # fiber ' + str(i) + '\n'
+        src += '      "nElements":         [' + str(i % 50 + 10) + '],\n'
+        src += '      "nodePositions":     [[0.0, 0.0, ' + str(i) + '.5], [1.0, 0.0, ' + str(i) + '.5]],  # start and end of the fiber\n'
+        src += '      "inputMeshIsGlobal": True,\n'
+        src += '      "setHermiteDerivatives": False,\n'
+        src += '      "logKey":            "fiber_' + str(i) + '",\n'
+        src += '    },\n'
+    src += '  },\n  "MappingsBetweenMeshes": {\n'
+    for i in range(fibers):
+        src += '    "MeshFiber_' + str(i) + '": {"name": "3Dmesh", "xiTolerance": 0.5, "enableWarnings": True},\n'
+    src += '  },\n}\n'
+    return src
+
+
+# returns the source of a settings.py with a mesh that has nodes nodePositions, like a mesh that was generated by a script and pasted in
+def generate_python_settings_large_list(nodes):
+    src = '# generated settings\n\nconfig = {\n  "Meshes": {\n    "3Dmesh": {\n      "nElements": [' + str(nodes - 1) + '],\n      "nodePositions": [\n'
+    for i in range(nodes):
+        src += '        [' + str(i) + '.0, 0.5, 1.25],\n'
+    src += '      ],\n      "inputMeshIsGlobal": True,\n    },\n  },\n}\n'
+    return src
+
+
+# returns the time in seconds for parsing the settings.py src (best of repeat runs)
+def benchmark_parse_python_settings(src, repeat=3):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        PythonSettings(src)
+        duration = time.perf_counter() - start
+        if best == None or duration < best:
+            best = duration
+    return best
+
+
+# returns the number of bytes that the SettingsDict of the config in the settings.py src needs
+# all lists are parsed (also the large ones), with compact_numeric_lists the lists of numbers are SettingsNumericLists
+def benchmark_python_settings_memory(src, compact_numeric_lists):
+    config = '{' + src.split('config = {', 1)[1].rsplit('}', 1)[0] + '}'
+    unparsed_min_entries = SettingsDict.unparsed_min_entries
+    SettingsDict.unparsed_min_entries = None
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+    settings = SettingsDict(config, compact_numeric_lists=compact_numeric_lists)
+    size = tracemalloc.get_traced_memory()[0] - start
+    tracemalloc.stop()
+    SettingsDict.unparsed_min_entries = unparsed_min_entries
+    return size
+
+
+# returns the time in seconds for parsing src (best of repeat runs)
+def benchmark_parse_cpp_src(src, repeat=3):
+    best = None
+    for _ in range(repeat):
+        cpp_tree = CPPTree()
+        cpp_tree.load_empty_simulation()
+        start = time.perf_counter()
+        cpp_tree.parse_cpp_src(src)
+        duration = time.perf_counter() - start
+        if best == None or duration < best:
+            best = duration
+    return best
+
+
+# returns the time in seconds for applying a change of one template_argument in the generated source of src (best of repeat runs)
+# this does the same as the gui when the c++-code gets applied:
+# if incremental is False the whole source gets parsed and the python-settings get parsed again for the new tree,
+# if incremental is True only the changed part gets parsed with parse_cpp_src_incremental()
+def benchmark_apply_cpp_src_change(src, incremental, repeat=3):
+    best = None
+    for _ in range(repeat):
+        cpp_tree = CPPTree()
+        cpp_tree.load_empty_simulation()
+        cpp_tree.parse_cpp_src(src)
+        src_generated = str(cpp_tree)
+        python_settings = str(cpp_tree.get_python_settings())
+        # change the last CellmlAdapter<4, 9> to CellmlAdapter<4, 10>
+        index = src_generated.rfind('9')
+        src_changed = src_generated[:index] + '10' + src_generated[index + 1:]
+        start = time.perf_counter()
+        if incremental:
+            cpp_tree.parse_cpp_src_incremental(src_changed)
+        else:
+            cpp_tree.parse_cpp_src(src_changed)
+            cpp_tree.parse_python_settings(python_settings)
+        duration = time.perf_counter() - start
+        if best == None or duration < best:
+            best = duration
+    return best
+
+
+# returns the number of bytes that one undo snapshot (UndoStack.duplicate_current_state()) of the tree of src needs
+# the tree gets the default python-settings of all its nodes first, like in the gui
+def benchmark_undo_snapshot_memory(src, snapshots=3):
+    cpp_tree = CPPTree()
+    cpp_tree.load_empty_simulation()
+    cpp_tree.parse_cpp_src(src)
+    cpp_tree.parse_python_settings(str(cpp_tree.get_python_settings()))
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+    for _ in range(snapshots):
+        cpp_tree.undo_stack.duplicate_current_state()
+    size = tracemalloc.get_traced_memory()[0] - start
+    tracemalloc.stop()
+    return size // snapshots
+
+
+def main():
+    sizes = [1000, 2000, 5000, 10000]
+    if len(sys.argv) > 1:
+        sizes = [int(size) for size in sys.argv[1:]]
+
+    print('parse_cpp_src')
+    print('{:>8} {:>10} {:>10}'.format('lines', 'chars', 'time [ms]'))
+    for size in sizes:
+        src = generate_cpp_src(size)
+        duration = benchmark_parse_cpp_src(src)
+        print('{:>8} {:>10} {:>10.1f}'.format(src.count('\n'), len(src), duration * 1000))
+
+    print('parse python-settings')
+    print('{:>8} {:>10} {:>10}'.format('entries', 'chars', 'time [ms]'))
+    for size in sizes:
+        src = generate_python_settings(size)
+        duration = benchmark_parse_python_settings(src)
+        print('{:>8} {:>10} {:>10.1f}'.format(size, len(src), duration * 1000))
+
+    print('parse python-settings with a large list (unparsed until it gets expanded, and parsed)')
+    print('{:>8} {:>10} {:>14} {:>12}'.format('entries', 'chars', 'unparsed [ms]', 'parsed [ms]'))
+    for size in sizes:
+        src = generate_python_settings_large_list(size)
+        duration = benchmark_parse_python_settings(src)
+        unparsed_min_entries = SettingsDict.unparsed_min_entries
+        SettingsDict.unparsed_min_entries = None
+        duration_parsed = benchmark_parse_python_settings(src)
+        SettingsDict.unparsed_min_entries = unparsed_min_entries
+        print('{:>8} {:>10} {:>14.1f} {:>12.1f}'.format(size, len(src), duration * 1000, duration_parsed * 1000))
+
+    print('memory of parsed python-settings with a large list (lists of numbers as SettingsNumericList and as SettingsList)')
+    print('{:>8} {:>14} {:>12}'.format('entries', 'compact [B]', 'list [B]'))
+    for size in sizes:
+        src = generate_python_settings_large_list(size)
+        print('{:>8} {:>14} {:>12}'.format(size, benchmark_python_settings_memory(src, True), benchmark_python_settings_memory(src, False)))
+
+    print('apply a change of one template_argument')
+    print('{:>8} {:>10} {:>16}'.format('lines', 'full [ms]', 'incremental [ms]'))
+    for size in sizes:
+        src = generate_cpp_src(size)
+        duration = benchmark_apply_cpp_src_change(src, incremental=False)
+        duration_incremental = benchmark_apply_cpp_src_change(src, incremental=True)
+        print('{:>8} {:>10.1f} {:>16.1f}'.format(src.count('\n'), duration * 1000, duration_incremental * 1000))
+
+    print('memory of one undo snapshot')
+    print('{:>8} {:>10}'.format('lines', 'bytes'))
+    for size in sizes:
+        src = generate_cpp_src(size)
+        print('{:>8} {:>10}'.format(src.count('\n'), benchmark_undo_snapshot_memory(src)))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,634 @@
+import os
+import copy
+import json
+import pickle
+import hashlib
+import threading
+from types import MappingProxyType
+from collections import namedtuple
+from collections.abc import Mapping
+
+from python_settings.python_settings import *
+from helpers import deepcopy_slots
+
+# the catalog is the expanded form of possible_solver_combinations
+# building it (importing possible_solver_combinations, expanding the template_arguments and fixing the lazy python_options) is a large share of the startup time
+# so the compiled catalog gets cached on disk and later starts just load it from there
+# there is only one Catalog per process, it is frozen and shared by all CPPTrees and Nodes
+# the python_options of a template are only fixed (lazy definitions like '{}' replaced) when they are used for the first time
+
+# directory of this file, all catalog sources are looked up relative to it
+src_dir = os.path.dirname(os.path.abspath(__file__))
+
+# the cached catalog gets rebuilt if one of these files changes
+# python_settings is included because the cache holds pickled python_settings objects
+catalog_sources = [
+    'possible_solver_combinations.py',
+    'catalog.py',
+    'python_settings/python_settings.py',
+    'python_settings/settings_activatable.py',
+    'python_settings/settings_child_placeholder.py',
+    'python_settings/settings_choice.py',
+    'python_settings/settings_comment.py',
+    'python_settings/settings_conditional.py',
+    'python_settings/settings_container.py',
+    'python_settings/settings_dict_entry.py',
+    'python_settings/settings_empty_line.py',
+    'python_settings/settings_list_entry.py',
+    'python_settings/settings_numeric_list.py',
+    'python_settings/settings_unparsed_container.py',
+]
+
+# the cache files are stored next to the bytecode of this module
+catalog_cache_dir = os.path.join(src_dir, '__pycache__')
+
+# optional ranking of the candidates of each slot by their usage in the examples, it is built by frequency_index.py
+frequency_index_path = os.path.join(src_dir, 'replacement_frequencies.json')
+
+# the Catalog of this process, so multiple CPPTrees don't load it multiple times
+_catalog = None
+_catalog_lock = threading.Lock()
+# lock for fixing the python_options of a CatalogTemplate
+_python_options_lock = threading.Lock()
+
+
+# returns the Catalog of this process, it gets created on the first call
+def get_catalog():
+    global _catalog
+    # the lock makes sure that sessions started concurrently don't build the catalog twice
+    with _catalog_lock:
+        if _catalog == None:
+            _catalog = Catalog(load_catalog_data())
+    return _catalog
+
+
+# returns a hash over all catalog_sources
+def get_catalog_hash():
+    h = hashlib.sha256()
+    for source in catalog_sources:
+        with open(os.path.join(src_dir, source), 'rb') as file:
+            h.update(file.read())
+    return h.hexdigest()
+
+
+def get_catalog_cache_path(catalog_hash):
+    return os.path.join(catalog_cache_dir, 'catalog.' + catalog_hash[:32] + '.pickle')
+
+
+# returns the catalog data (the expanded possible_solver_combinations as plain dicts and lists)
+# it is loaded from the on-disk cache if possible, otherwise it is built and stored in the cache
+def load_catalog_data():
+    try:
+        catalog_hash = get_catalog_hash()
+    except OSError:
+        # if we can't read the sources, we can't use the cache
+        catalog_hash = None
+
+    catalog_data = None
+    if catalog_hash:
+        catalog_data = read_catalog_cache(get_catalog_cache_path(catalog_hash))
+    if catalog_data == None:
+        catalog_data = build_catalog_data()
+        if catalog_hash:
+            write_catalog_cache(get_catalog_cache_path(catalog_hash), catalog_data)
+    return catalog_data
+
+
+# returns the catalog data stored in path or None if there is no valid cache
+def read_catalog_cache(path):
+    try:
+        with open(path, 'rb') as file:
+            return pickle.load(file)
+    except Exception:
+        # a missing or broken cache is not an error, we just build the catalog again
+        return None
+
+
+# stores catalog_data in path
+# the file is written to a temporary file first and then moved, so concurrently starting instances never see a partial cache
+def write_catalog_cache(path, catalog_data):
+    # tempfile is only imported here, because it is not needed if the cache is valid
+    import tempfile
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='catalog.', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as file:
+                pickle.dump(catalog_data, file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except:
+            os.remove(tmp_path)
+            raise
+    except Exception:
+        # the cache is only an optimization (e.g. src could be read-only)
+        pass
+
+
+# returns the frequencies stored in the index at path: {parent: [{name: count} for every slot]}
+# if there is no valid index, the frequencies are empty and the candidates keep the order of possible_solver_combinations
+def read_frequency_index(path):
+    try:
+        with open(path, 'r') as file:
+            frequencies = json.load(file)['frequencies']
+        if isinstance(frequencies, dict):
+            return frequencies
+    except Exception:
+        pass
+    return {}
+
+
+# builds the catalog data from possible_solver_combinations
+# possible_solver_combinations itself is not changed, everything that gets expanded or fixed is copied
+def build_catalog_data():
+    # only import possible_solver_combinations if we really need it, importing it is expensive
+    from possible_solver_combinations import possible_solver_combinations
+
+    catalog_data = {}
+    for key, value in possible_solver_combinations.items():
+        template = dict(value)
+        if "template_arguments" in template:
+            template["template_arguments"] = list(template["template_arguments"])
+        # python_options are kept as they are, they get copied and fixed by CatalogTemplate when they are used
+        catalog_data[key] = template
+
+    # index over all keys, used to expand the template_arguments below
+    catalog_index = CatalogIndex(catalog_data)
+
+    # expand all template_arguments sublists of the form:
+    # [ "Mesh::" ]
+    # to the form:
+    # [ "Mesh::StructuredRegularFixedOfDimension", "Mesh::StructuredDeformableOfDimension" ... ]
+    # AND
+    # expand all template_arguments sublists of the form:
+    # [ "discretizableInTime" ]
+    # to the form:
+    # [ "SpatialDiscretization::FiniteElementMethod", "CellmlAdapter", ... ]
+    # AND
+    # expand all template_arguments sublists of the form:
+    # [ "timeSteppingScheme" ]
+    # to the form:
+    # [ "OperatorSplitting::Strang", "TimeSteppingScheme::Heun", ... ]
+    for _key, value in catalog_data.items():
+        template_arguments = value.get("template_arguments", [])
+        for i in range(0, len(template_arguments)):
+            (template_argument_description,
+             template_argument) = template_arguments[i]
+            template_arguments[i] = (template_argument_description, catalog_index.expand(template_argument))
+
+    # add template_arguments for GLOBAL (runnables)
+    catalog_data['GLOBAL']["template_arguments"] = [
+        ("Runnable", list(catalog_index.get_keys_with_flag('runnable')))]
+
+    return catalog_data
+
+
+# the frozen catalog of all templates, one catalog is shared by all CPPTrees of a process
+# it can be used like the dict possible_solver_combinations, but the templates can't be changed:
+# the templates are read-only CatalogTemplates and template_arguments are tuples of (description, tuple of possible names)
+# python_options are shared by all users of the catalog, they are read-only and must be copied to change them
+# it also holds caches that are filled while it is used, they are shared by all CPPTrees too:
+#   replacements    the candidates of get_replacements(), ranked with frequencies
+#   slot_errors     the Errors of Node.validate_cpp_src() (they only depend on the catalog, so they are the same for every tree)
+# frequencies (the frequency index, see frequency_index.py) are fixed when the catalog is created, so the replacements never get stale
+# if they are not given, they are read from frequency_index_path with the first call of get_replacements()
+class Catalog(Mapping):
+    def __init__(self, catalog_data, frequencies=None):
+        templates = {}
+        for key, value in catalog_data.items():
+            template = dict(value)
+            if "template_arguments" in template:
+                template["template_arguments"] = tuple((description, tuple(names)) for (description, names) in template["template_arguments"])
+            templates[key] = CatalogTemplate(template)
+        self.templates = MappingProxyType(templates)
+        # index over the keys of this catalog (e.g. to get all templates in a namespace)
+        self.index = CatalogIndex(self.templates)
+
+        # reverse index: name -> tuple of (parent, slot index, slot description) for every slot that accepts name
+        # names that are no templates (e.g. "Integer" or "3") are also in it
+        self.parents = {}
+        for key, template in self.templates.items():
+            for i, (description, names) in enumerate(template.get("template_arguments", ())):
+                for name in dict.fromkeys(names):
+                    self.parents.setdefault(name, []).append((key, i, description))
+        # the same as a set of (parent, slot index) for each name, to check if a slot accepts a name
+        self.parent_slots = {}
+        for name in self.parents:
+            self.parents[name] = tuple(self.parents[name])
+            self.parent_slots[name] = frozenset((parent, i) for (parent, i, _description) in self.parents[name])
+
+        # which templates can be reached below each template and how deep a complete subtree has to be at least
+        self.reachability = CatalogReachability(self)
+
+        # (parent, slot index) -> (slot description, tuple of ReplacementCandidates), filled by get_replacements()
+        self.replacements = {}
+        self.frequencies = frequencies
+        # (parent, slot index, name) -> tuple of Errors, filled by Node.validate_cpp_src()
+        self.slot_errors = {}
+
+    def __getitem__(self, key):
+        return self.templates[key]
+
+    # returns all (parent, slot index, slot description) where name can be used as template_argument
+    def get_parents(self, name):
+        return self.parents.get(name, ())
+
+    # returns True if name is a possible template_argument for the slot slot_index of parent
+    def accepts(self, parent, slot_index, name):
+        return (parent, slot_index) in self.parent_slots.get(name, ())
+
+    # returns (slot description, tuple of ReplacementCandidates) for the slot slot_index of parent
+    # the candidates that are used most in the examples come first (see frequency_index.py), the others keep their order
+    # they are created on the first call for a slot and shared by all later calls (e.g. every time the replace window opens)
+    def get_replacements(self, parent, slot_index):
+        key = (parent, slot_index)
+        replacements = self.replacements.get(key)
+        if replacements == None:
+            (description, names) = self.templates[parent]["template_arguments"][slot_index]
+            if self.frequencies == None:
+                self.frequencies = read_frequency_index(frequency_index_path)
+            slot_frequencies = self.frequencies.get(parent, ())
+            if slot_index < len(slot_frequencies):
+                slot_frequencies = slot_frequencies[slot_index]
+                names = sorted(names, key=lambda name: -slot_frequencies.get(name, 0))
+            candidates = []
+            for name in names:
+                # names that are no templates (e.g. "Integer") can't have childs
+                template = self.templates.get(name)
+                candidates.append(ReplacementCandidate(name, template != None and "template_arguments" in template))
+            replacements = (description, tuple(candidates))
+            self.replacements[key] = replacements
+        return replacements
+
+    def __iter__(self):
+        return iter(self.templates)
+
+    def __len__(self):
+        return len(self.templates)
+
+    # the catalog is frozen, so copies (e.g. the deepcopys of the UndoStack) can share it
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    # pickled trees (e.g. in the ParseCache) only store a reference to the catalog of the process they get unpickled in
+    def __reduce__(self):
+        return (get_catalog, ())
+
+
+# an immutable candidate for a slot of a template, see Catalog.get_replacements()
+# the gui lists these instead of Nodes, a Node only gets created for the candidate that is picked (Node.create_replacement())
+ReplacementCandidate = namedtuple('ReplacementCandidate', ('name', 'can_have_childs'))
+
+
+# a read-only template of the Catalog
+# its python_options are stored as they are written in possible_solver_combinations (with lazy definitions like '{}' and '[1, 2, 3]')
+# they get copied, fixed and made read-only the first time they are accessed (normally by Node.get_default_python_settings_dict())
+# this way a session only pays for the templates it really uses
+class CatalogTemplate(Mapping):
+    def __init__(self, template):
+        # only this class changes it (when the python_options get fixed), the users get its values with []
+        self.__template = template
+        self.python_options_fixed = not "python_options" in template
+
+    def __getitem__(self, key):
+        if key == "python_options" and not self.python_options_fixed:
+            self.fix_python_options()
+        return self.__template[key]
+
+    # this is overwritten, because the default implementation would fix the python_options
+    def __contains__(self, key):
+        return key in self.__template
+
+    def __iter__(self):
+        return iter(self.__template)
+
+    def __len__(self):
+        return len(self.__template)
+
+    def fix_python_options(self):
+        with _python_options_lock:
+            # check again, another thread could have fixed them while we waited for the lock
+            if not self.python_options_fixed:
+                # copy the python_options, they could still belong to possible_solver_combinations
+                python_options = copy.deepcopy(self.__template["python_options"])
+                fix_lazy_recursive(python_options)
+                make_read_only_recursive(python_options)
+                self.__template["python_options"] = python_options
+                self.python_options_fixed = True
+
+
+# transitive closure over the template_arguments of a catalog
+# every template gets an id (its position in the catalog) and sets of templates are stored as bitsets (python ints, bit id is set)
+# for every template this holds:
+#  - reachable: all templates that can appear anywhere below it
+#  - min_completion_depth: how many levels of templates are needed at least until all needed template_arguments are filled
+#    (0 for templates without needed template_arguments, None if there is no finite completion)
+# names in template_arguments that are no templates (e.g. "Integer" or "3") count as complete leafs
+class CatalogReachability:
+    def __init__(self, catalog):
+        self.catalog = catalog
+        self.keys = tuple(catalog)
+        self.ids = {}
+        for i, key in enumerate(self.keys):
+            self.ids[key] = i
+
+        # bitset of the templates in each slot: (key, slot index) -> bitset
+        self.slot_masks = {}
+        # bitset of the templates in all slots of a template
+        self.child_masks = [0] * len(self.keys)
+        for key, template in catalog.items():
+            for i, (_description, names) in enumerate(template.get("template_arguments", ())):
+                mask = self.get_mask(names)
+                self.slot_masks[(key, i)] = mask
+                self.child_masks[self.ids[key]] |= mask
+
+        # iterate until nothing changes: reachable = childs + everything reachable from the childs
+        self.reachable = list(self.child_masks)
+        changed = True
+        while changed:
+            changed = False
+            for i in range(len(self.keys)):
+                reachable = self.reachable[i]
+                for j in self.iterate_ids(reachable):
+                    reachable |= self.reachable[j]
+                if reachable != self.reachable[i]:
+                    self.reachable[i] = reachable
+                    changed = True
+
+        # iterate until nothing changes: a template is complete at depth d if every needed slot has a name that is complete at depth d-1
+        # min_completion_childs holds the names to use for the needed slots to get this depth
+        self.min_completion_depth = [None] * len(self.keys)
+        self.min_completion_childs = [None] * len(self.keys)
+        changed = True
+        while changed:
+            changed = False
+            for key, template in catalog.items():
+                i = self.ids[key]
+                template_arguments = template.get("template_arguments", ())
+                needed = template.get("template_arguments_needed", len(template_arguments))
+                depth = 0
+                childs = []
+                for (_description, names) in template_arguments[:needed]:
+                    best_name = None
+                    best_depth = None
+                    for name in names:
+                        name_depth = self.get_min_completion_depth(name)
+                        if name_depth != None and (best_depth == None or name_depth < best_depth):
+                            best_name = name
+                            best_depth = name_depth
+                    if best_depth == None:
+                        depth = None
+                        break
+                    depth = max(depth, best_depth + 1)
+                    childs.append(best_name)
+                if depth != None and (self.min_completion_depth[i] == None or depth < self.min_completion_depth[i]):
+                    self.min_completion_depth[i] = depth
+                    self.min_completion_childs[i] = tuple(childs)
+                    changed = True
+
+    # returns the bitset of all templates in names
+    def get_mask(self, names):
+        mask = 0
+        for name in names:
+            if name in self.ids:
+                mask |= 1 << self.ids[name]
+        return mask
+
+    # returns the bitset of all templates in namespace (e.g. "Mesh::")
+    def get_namespace_mask(self, namespace):
+        return self.get_mask(self.catalog.index.get_keys_with_namespace(namespace))
+
+    # yields the ids of all set bits in mask
+    def iterate_ids(self, mask):
+        while mask:
+            low_bit = mask & -mask
+            yield low_bit.bit_length() - 1
+            mask ^= low_bit
+
+    # returns the names of all templates in mask in the order of the catalog
+    def get_keys(self, mask):
+        return [self.keys[i] for i in self.iterate_ids(mask)]
+
+    # returns the bitset of all templates that can appear below name
+    def get_reachable_mask(self, name):
+        if not name in self.ids:
+            return 0
+        return self.reachable[self.ids[name]]
+
+    # returns the bitset of all templates that can appear in the slot slot_index of parent or below it
+    def get_slot_reachable_mask(self, parent, slot_index):
+        mask = self.slot_masks.get((parent, slot_index), 0)
+        reachable = mask
+        for i in self.iterate_ids(mask):
+            reachable |= self.reachable[i]
+        return reachable
+
+    # returns True if a template of mask can appear below name
+    def can_reach(self, name, mask):
+        return self.get_reachable_mask(name) & mask != 0
+
+    # returns True if a template of mask can appear in the slot slot_index of parent or below it
+    # e.g. slot_can_reach("GLOBAL", 0, reachability.get_namespace_mask("Mesh::"))
+    def slot_can_reach(self, parent, slot_index, mask):
+        return self.get_slot_reachable_mask(parent, slot_index) & mask != 0
+
+    # returns the minimal number of template levels below name until all needed template_arguments are filled
+    # names that are no templates are complete leafs (0), None means there is no finite completion
+    def get_min_completion_depth(self, name):
+        if not name in self.ids:
+            return 0
+        return self.min_completion_depth[self.ids[name]]
+
+    # returns the names to use for the needed template_arguments of name to get a completion of minimal depth
+    def get_min_completion_childs(self, name):
+        if not name in self.ids:
+            return ()
+        return self.min_completion_childs[self.ids[name]]
+
+
+# a node of the namespace trie in CatalogIndex
+class CatalogIndexTrieNode:
+    def __init__(self):
+        # the next namespace level, e.g. for the node of "Equation" this has the keys "Dynamic", "Static", ...
+        self.childs = {}
+        # all keys below this node in the order of the catalog (e.g. for "Mesh" all keys starting with "Mesh::")
+        self.keys = []
+
+
+# index over the keys of a catalog
+# it holds a trie over the namespaces of the keys and a list of keys for each flag (runnable, discretizableInTime, timeSteppingScheme)
+# this way expanding template_arguments and looking up templates by namespace only cost as much as the result is long
+class CatalogIndex:
+    flags = ['runnable', 'discretizableInTime', 'timeSteppingScheme']
+
+    def __init__(self, combinations):
+        self.trie = CatalogIndexTrieNode()
+        self.flag_buckets = {}
+        for flag in self.flags:
+            self.flag_buckets[flag] = []
+
+        for key, value in combinations.items():
+            # add key to the trie, every namespace it is in gets the key
+            trie_node = self.trie
+            for namespace in key.split('::')[:-1]:
+                trie_node = trie_node.childs.setdefault(namespace, CatalogIndexTrieNode())
+                trie_node.keys.append(key)
+            # add key to the flag_buckets
+            for flag in self.flags:
+                if value.get(flag, False) == True:
+                    self.flag_buckets[flag].append(key)
+
+        # freeze the lists, so they can be handed out without copying
+        self.freeze_recursive(self.trie)
+        for flag in self.flags:
+            self.flag_buckets[flag] = tuple(self.flag_buckets[flag])
+
+    def freeze_recursive(self, trie_node):
+        trie_node.keys = tuple(trie_node.keys)
+        for child in trie_node.childs.values():
+            self.freeze_recursive(child)
+
+    # returns all keys in namespace (e.g. "Mesh::" or "Equation::Static") in the order of the catalog
+    def get_keys_with_namespace(self, namespace):
+        if namespace.endswith('::'):
+            namespace = namespace[:-2]
+        trie_node = self.trie
+        for n in namespace.split('::'):
+            trie_node = trie_node.childs.get(n)
+            if trie_node == None:
+                return ()
+        return trie_node.keys
+
+    # returns all keys that have flag (e.g. "runnable") set to True
+    def get_keys_with_flag(self, flag):
+        return self.flag_buckets[flag]
+
+    # returns a new template_argument list with all "Xyz::", "discretizableInTime" and "timeSteppingScheme" items expanded
+    def expand(self, template_argument):
+        expanded = []
+        for item in template_argument:
+            if item.endswith('::'):
+                expanded.extend(self.get_keys_with_namespace(item))
+            elif item == "discretizableInTime" or item == "timeSteppingScheme":
+                expanded.extend(self.get_keys_with_flag(item))
+            else:
+                expanded.append(item)
+        return expanded
+
+
+def fix_lazy_recursive(settings_container):
+    for entry in settings_container:
+        if isinstance(entry, SettingsDictEntry) or isinstance(entry, SettingsListEntry):
+            # while we are at it, we can complete the urls in the SettingsListEntrys
+            if isinstance(entry, SettingsDictEntry) and entry.doc_link:
+                # only fix it once, some reused SettingsDictEntrys e.g. things in outputwriter are called here multiple times
+                if not entry.doc_link.startswith("https://"):
+                    entry.doc_link = 'https://opendihu.readthedocs.io/en/latest/settings/' + entry.doc_link
+            if isinstance(entry.value, str):
+                if entry.value.startswith('{') and entry.value.endswith('}'):
+                    entry.value = SettingsDict(entry.value)
+                    #print(entry.value)
+                elif entry.value.startswith('[') and entry.value.endswith(']'):
+                    entry.value = SettingsList(entry.value)
+                    #print(entry.value)
+                else:
+                    continue
+            else:
+                fix_lazy_recursive(entry.value)
+        elif isinstance(entry, SettingsChildPlaceholder):
+            continue
+        elif isinstance(entry, SettingsMesh) or isinstance(entry, SettingsDict):
+            fix_lazy_recursive(entry)
+        elif isinstance(entry, SettingsChoice):
+            fix_lazy_recursive(entry.defaults)
+            fix_lazy_recursive(entry.alternatives)
+        elif isinstance(entry, SettingsMesh) or isinstance(entry, SettingsSolver):
+            fix_lazy_recursive(entry)
+        else:
+            fix_lazy_recursive(entry.value)
+
+
+# the python_options of the catalog are shared by all CPPTrees and Nodes, they are made read-only when they get fixed
+# the classes of their containers and entries get replaced by these subclasses, changing them raises a TypeError
+# their deepcopys (e.g. the default entries that Node.insert_missing_default_python_settings_deactivated() adds) are of the normal classes again
+class ReadOnlySettings:
+    __slots__ = ()
+    # the class of the copies
+    writable_class = None
+
+    def raise_read_only(self, *args, **kwargs):
+        raise TypeError(self.writable_class.__name__ + ' of the catalog is read-only, use copy.deepcopy() to get one that can be changed')
+
+    append = insert = extend = __iadd__ = pop = remove = clear = __setitem__ = __delitem__ = sort = reverse = raise_read_only
+
+    # only the key_index (a cache) of a SettingsDict can be set
+    def __setattr__(self, name, value):
+        if name != 'key_index':
+            self.raise_read_only()
+        object.__setattr__(self, name, value)
+
+    def __deepcopy__(self, memo):
+        return deepcopy_slots(self, memo, skip=('key_index',), cls=self.writable_class)
+
+    # pickles store a copy, it could not be restored with the read-only class
+    def __reduce_ex__(self, protocol):
+        return (get_unpickled_copy, (copy.deepcopy(self),))
+
+# the copy is unpickled before this gets called
+def get_unpickled_copy(settings):
+    return settings
+
+class ReadOnlySettingsDict(ReadOnlySettings, SettingsDict):
+    __slots__ = ()
+    writable_class = SettingsDict
+
+class ReadOnlySettingsMesh(ReadOnlySettings, SettingsMesh):
+    __slots__ = ()
+    writable_class = SettingsMesh
+
+class ReadOnlySettingsSolver(ReadOnlySettings, SettingsSolver):
+    __slots__ = ()
+    writable_class = SettingsSolver
+
+class ReadOnlySettingsList(ReadOnlySettings, SettingsList):
+    __slots__ = ()
+    writable_class = SettingsList
+
+class ReadOnlySettingsDictEntry(ReadOnlySettings, SettingsDictEntry):
+    __slots__ = ()
+    writable_class = SettingsDictEntry
+
+class ReadOnlySettingsListEntry(ReadOnlySettings, SettingsListEntry):
+    __slots__ = ()
+    writable_class = SettingsListEntry
+
+read_only_classes = {
+    SettingsDict: ReadOnlySettingsDict,
+    SettingsMesh: ReadOnlySettingsMesh,
+    SettingsSolver: ReadOnlySettingsSolver,
+    SettingsList: ReadOnlySettingsList,
+    SettingsDictEntry: ReadOnlySettingsDictEntry,
+    SettingsListEntry: ReadOnlySettingsListEntry,
+}
+
+# replaces the classes of all containers and entries in settings (fixed python_options) with their ReadOnlySettings classes
+# SettingsChoices and SettingsConditionals keep their class, but their containers get read-only
+def make_read_only_recursive(settings):
+    stack = [settings]
+    while stack:
+        value = stack.pop()
+        read_only_class = read_only_classes.get(type(value))
+        if read_only_class != None:
+            object.__setattr__(value, '__class__', read_only_class)
+        if isinstance(value, SettingsContainer):
+            stack.extend(value)
+        elif isinstance(value, SettingsDictEntry) or isinstance(value, SettingsListEntry):
+            stack.append(value.value)
+        elif isinstance(value, SettingsChoice):
+            stack.append(value.defaults)
+            stack.append(value.alternatives)
+        elif isinstance(value, SettingsConditional):
+            stack.append(value.if_block)
+            stack.append(value.else_block)
@@ -0,0 +1,172 @@
+import re
+
+# a lexer for the c++ sources of opendihu examples
+# it splits the whole source in one pass into tokens, this replaces the many re.sub passes over the whole source
+# and the character by character string building that were used by CPPTree.parse_cpp_src() before
+
+# a token of the c++ source
+# kind is one of 'comment', 'string', 'punct' (one of < > , ; ( ) =) and 'word' (everything else, e.g. Mesh::StructuredRegularFixedOfDimension or 3)
+# start and end are the offsets of the token in the source
+class CPPToken:
+    def __init__(self, kind, value, start, end):
+        self.kind = kind
+        self.value = value
+        self.start = start
+        self.end = end
+
+    def __repr__(self):
+        return self.kind + ':' + self.value
+
+
+_token_regex = re.compile(
+    r'(?P<comment>//[^\n]*)'
+    r'|(?P<block_comment>/\*.*?(?:\*/|\Z))'
+    r'|(?P<string>"(?:\\.|[^"\\\n])*"?)'
+    r'|(?P<punct>[<>,;()=])'
+    r'|(?P<word>(?:[^\s<>,;()="/]|/(?![/*]))+)'
+    r'|(?P<space>\s+)', re.S)
+
+_whitespace_regex = re.compile(r'\s+')
+
+
+# returns the list of CPPTokens of src
+# whitespace and /* */ comments are dropped
+# the value of a comment token is the text after // with all whitespace replaced by a simple whitespace
+def tokenize_cpp_src(src):
+    tokens = []
+    for match in _token_regex.finditer(src):
+        kind = match.lastgroup
+        if kind == 'space' or kind == 'block_comment':
+            continue
+        value = match.group()
+        if kind == 'comment':
+            value = _whitespace_regex.sub(' ', value[2:])
+        tokens.append(CPPToken(kind, value, match.start(), match.end()))
+    return tokens
+
+
+# searches the first occurrence of the sequence of token values at or after start (comments in between are skipped)
+# returns (index of the first token, index after the last token) or None if the sequence does not exist
+def find_token_sequence(tokens, values, start=0):
+    for i in range(start, len(tokens)):
+        if tokens[i].kind == 'comment' or tokens[i].value != values[0]:
+            continue
+        j = i
+        matched = 0
+        while j < len(tokens) and matched < len(values):
+            if tokens[j].kind != 'comment':
+                if tokens[j].value != values[matched]:
+                    break
+                matched = matched + 1
+            j = j + 1
+        if matched == len(values):
+            return (i, j)
+    return None
+
+
+# returns the index after the next ';' token at or after start (or len(tokens))
+def find_statement_end(tokens, start):
+    for i in range(start, len(tokens)):
+        if tokens[i].kind == 'punct' and tokens[i].value == ';':
+            return i + 1
+    return len(tokens)
+
+
+# holds the type aliases of a c++ source, e.g. for
+#   typedef Mesh::StructuredDeformableOfDimension<3> MeshType;
+#   using FiniteElementMethod = SpatialDiscretization::FiniteElementMethod<MeshType, ...>;
+# MeshType -> tokens of Mesh::StructuredDeformableOfDimension<3>
+# aliases can use other aliases, they are resolved once when they are used for the first time
+class SymbolTable:
+    def __init__(self):
+        # alias -> tokens of the definition as they are written in the source
+        self.definitions = {}
+        # alias -> tokens of the definition with all aliases in it resolved
+        self.resolved = {}
+
+    def add(self, alias, tokens):
+        self.definitions[alias] = tokens
+        self.resolved.clear()
+
+    # returns the tokens with all aliases replaced by their resolved definitions
+    # resolving holds the aliases that are resolved at the moment
+    # they are left as they are, a cycle (e.g. typedef A<B> B;) is no valid c++ anyway
+    def resolve_tokens(self, tokens, resolving=()):
+        if not self.definitions:
+            return tokens
+        resolved = []
+        for token in tokens:
+            if token.kind == 'word' and token.value in self.definitions and not token.value in resolving:
+                resolved.extend(self.resolve(token.value, resolving))
+            else:
+                resolved.append(token)
+        return resolved
+
+    # returns the tokens of the definition of alias with all aliases in it resolved
+    def resolve(self, alias, resolving=()):
+        if not alias in self.resolved:
+            self.resolved[alias] = self.resolve_tokens(self.definitions[alias], set(resolving) | {alias})
+        return self.resolved[alias]
+
+
+# removes typedef, using and LOG(DEBUG) statements from tokens
+# the aliases of the typedef and using statements are added to symbol_table
+# returns the new list of tokens (the aliases in it are not resolved yet)
+def remove_declarations(tokens, symbol_table):
+    remaining = []
+    i = 0
+    while i < len(tokens):
+        token = tokens[i]
+        if token.kind == 'word' and (token.value == 'typedef' or token.value == 'using'):
+            end = find_statement_end(tokens, i)
+            statement = [t for t in tokens[i + 1:end] if t.kind != 'comment' and t.value != ';']
+            if token.value == 'typedef':
+                # typedef <definition> <alias>;
+                if len(statement) >= 2:
+                    symbol_table.add(statement[-1].value, statement[:-1])
+            else:
+                # using <alias> = <definition>;
+                # (using namespace std; and using std::vector; don't define aliases, they are just removed)
+                if len(statement) >= 3 and statement[1].value == '=':
+                    symbol_table.add(statement[0].value, statement[2:])
+            # comments in the statement are kept
+            remaining.extend(t for t in tokens[i + 1:end] if t.kind == 'comment')
+            i = end
+        elif token.kind == 'word' and token.value == 'LOG' and find_token_sequence(tokens, ['LOG', '(', 'DEBUG', ')'], i) == (i, i + 4):
+            i = find_statement_end(tokens, i)
+        else:
+            remaining.append(token)
+            i = i + 1
+    return remaining
+
+
+# returns the tokens of the problem in src, e.g. for
+#   DihuContext settings(argc, argv);
+#   Control::Coupling<A, B> problem(settings);
+# the tokens of Control::Coupling<A, B> (and the comments before it)
+# raises an Exception if there is no problem in src
+def get_problem_tokens(src):
+    symbol_table = SymbolTable()
+    tokens = remove_declarations(tokenize_cpp_src(src), symbol_table)
+
+    # the problem starts after settings(argc, argv);
+    (_start, problem_start) = find_token_sequence(tokens, ['settings', '(', 'argc', ',', 'argv', ')', ';'])
+    # and ends before the name of the variable that gets (settings);
+    (problem_end, _end) = find_token_sequence(tokens, ['(', 'settings', ')', ';'], problem_start)
+
+    # everything after the last > is the name of the variable
+    problem = None
+    for i in range(problem_end - 1, problem_start - 1, -1):
+        if tokens[i].kind == 'punct' and tokens[i].value == '>':
+            problem = tokens[problem_start:i + 1]
+            break
+    # no template_arguments (e.g. Dummy problem(settings);): just remove the name of the variable
+    if problem == None:
+        problem = []
+        for i in range(problem_end - 1, problem_start - 1, -1):
+            if tokens[i].kind != 'comment':
+                problem = tokens[problem_start:i] + tokens[i + 1:problem_end]
+                break
+
+    # resolve the aliases, only in the problem (the rest of the source is not needed)
+    return symbol_table.resolve_tokens(problem)
@@ -1,13 +1,60 @@
-import re
 import copy
 import traceback
 
 from helpers import printe, indent, Error, Info, Warning
-# this also import python_settings.python_settings
-from possible_solver_combinations import *
+from python_settings.python_settings import *
+from catalog import get_catalog
+from cpp_lexer import tokenize_cpp_src, get_problem_tokens
 from node import Node
 from root_node import RootNode
 from undo_stack import UndoStack
+from parse_cache import ParseCache
+
+# returns the length of the common prefix of a and b
+# the prefix is searched with a bisection over slices, so the characters are compared in C and not one by one in python
+def get_common_prefix_length(a, b):
+    low = 0
+    high = min(len(a), len(b))
+    while low < high:
+        middle = (low + high + 1) // 2
+        if a[low:middle] == b[low:middle]:
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+
+# returns the length of the common suffix of a and b
+def get_common_suffix_length(a, b):
+    low = 0
+    high = min(len(a), len(b))
+    while low < high:
+        middle = (low + high + 1) // 2
+        if a[len(a) - middle:len(a) - low] == b[len(b) - middle:len(b) - low]:
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+
+# returns True if the < and > in tokens (the tokens of the source of one node) are balanced and the first < is closed by the last token
+# otherwise the source is not exactly one node (e.g. a > got deleted and the next template_arguments belong to it now)
+def is_template_balanced(tokens):
+    depth = 0
+    last = len(tokens) - 1
+    for i, token in enumerate(tokens):
+        if token.kind != 'punct':
+            continue
+        if token.value == '<':
+            depth = depth + 1
+        elif token.value == '>':
+            depth = depth - 1
+            if depth < 0:
+                return False
+            if depth == 0 and i != last:
+                return False
+    return depth == 0
+
 
 # this class is the backend
 # it holds the cpp-tree and all functions that can be used by an interface
@@ -19,107 +66,26 @@ class CPPTree:
         self.cpp_template = file_cpp_template.read()
         file_cpp_template.close()
 
-        self.combinations = possible_solver_combinations
-
-        # create a list of keys
-        self.keys = list(self.combinations.keys())
-
-        # create lists of runnable, discretizableInTime, timeSteppingScheme
-        # runnable is used in validate_src(), the other lists are used to expand some template_arguments
-        self.runnables = []
-        self.discretizableInTime = []
-        self.timeSteppingScheme = []
-        for i in range(0, len(self.keys)):
-            if self.combinations[self.keys[i]].get('runnable', False) == True:
-                self.runnables.append(self.keys[i])
-            if self.combinations[self.keys[i]].get('discretizableInTime', False) == True:
-                self.discretizableInTime.append(self.keys[i])
-            if self.combinations[self.keys[i]].get('timeSteppingScheme', False) == True:
-                self.timeSteppingScheme.append(self.keys[i])
-
-        # expand all template_arguments sublists of the form:
-        # [ "Mesh::" ]
-        # to the form:
-        # [ "Mesh::StructuredRegularFixedOfDimension", "Mesh::StructuredDeformableOfDimension" ... ]
-        # AND
-        # expand all template_arguments sublists of the form:
-        # [ "discretizableInTime" ]
-        # to the form:
-        # [ "SpatialDiscretization::FiniteElementMethod", "CellmlAdapter", ... ]
-        # AND
-        # expand all template_arguments sublists of the form:
-        # [ "timeSteppingScheme" ]
-        # to the form:
-        # [ "OperatorSplitting::Strang", "TimeSteppingScheme::Heun", ... ]
-        for _key, value in self.combinations.items():
-            template_arguments = value.get("template_arguments", [])
-            for i in range(0, len(template_arguments)):
-                (_template_argument_description,
-                 template_argument) = template_arguments[i]
-                for item in template_argument:
-                    # expand ::
-                    if len(item) >= 2 and item[-1] == ':' and item[-2] == ':':
-                        # if item ends with '::'
-                        template_argument.remove(item)
-                        for key_sub in self.keys:
-                            if key_sub.startswith(item):
-                                template_argument.append(key_sub)
-                    # expand discretizableInTime
-                    if item == "discretizableInTime":
-                        template_argument.remove(item)
-                        for key_sub in self.discretizableInTime:
-                            template_argument.append(key_sub)
-                    # expand timeSteppingScheme
-                    if item == "timeSteppingScheme":
-                        template_argument.remove(item)
-                        for key_sub in self.timeSteppingScheme:
-                            template_argument.append(key_sub)
-
-        # add template_arguments for GLOBAL (runnables)
-        self.combinations['GLOBAL']["template_arguments"] = [
-            ("Runnable", self.runnables)]
-
-        def fix_lazy_recursive(settings_container):
-            for entry in settings_container:
-                if isinstance(entry, SettingsDictEntry) or isinstance(entry, SettingsListEntry):
-                    # while we are at it, we can complete the urls in the SettingsListEntrys
-                    if isinstance(entry, SettingsDictEntry) and entry.doc_link:
-                        # only fix it once, some reused SettingsDictEntrys e.g. things in outputwriter are called here multiple times
-                        if not entry.doc_link.startswith("https://"):
-                            entry.doc_link = 'https://opendihu.readthedocs.io/en/latest/settings/' + entry.doc_link
-                    if isinstance(entry.value, str):
-                        if entry.value.startswith('{') and entry.value.endswith('}'):
-                            entry.value = SettingsDict(entry.value)
-                            #print(entry.value)
-                        elif entry.value.startswith('[') and entry.value.endswith(']'):
-                            entry.value = SettingsList(entry.value)
-                            #print(entry.value)
-                        else:
-                            continue
-                    else:
-                        fix_lazy_recursive(entry.value)
-                elif isinstance(entry, SettingsChildPlaceholder):
-                    continue
-                elif isinstance(entry, SettingsMesh) or isinstance(entry, SettingsDict):
-                    fix_lazy_recursive(entry)
-                elif isinstance(entry, SettingsChoice):
-                    fix_lazy_recursive(entry.defaults)
-                    fix_lazy_recursive(entry.alternatives)
-                elif isinstance(entry, SettingsMesh) or isinstance(entry, SettingsSolver):
-                    fix_lazy_recursive(entry)
-                else:
-                    fix_lazy_recursive(entry.value)
-        # iterate over python_options and fix lazy definitions like '{}' and '[1, 2, 3]' replace them with SettingsDict() and SettingsList(SettingsListEntry(..),..)
-        for _key, value in self.combinations.items():
-            if not "python_options" in value:
-                continue
-            #value["python_options"] = SettingsDict(value["python_options"].repr(0, hide_placeholders=False))
-            python_options = value["python_options"]
-            fix_lazy_recursive(python_options)
-            #print(python_options)
+        # the frozen Catalog of all templates, it is shared with all other CPPTrees of this process
+        self.combinations = get_catalog()
+        # index over the keys of self.combinations (e.g. to get all templates in a namespace)
+        self.catalog_index = self.combinations.index
 
         self.undo_stack = UndoStack()
 
+        # parsed cpp- and python-sources, so parsing the same source again is fast (hits and misses are counted in it)
+        self.parse_cache = ParseCache()
+
+        # edits of root.cpp_src by replace_node() and delete_node() that are not shown by the gui yet (see update_cpp_src())
+        self.cpp_src_edits = None
+        self.cpp_src_edits_root = None
+        self.cpp_src_edits_base = None
+
+    # returns all (parent, slot index, slot description) where the template name can be used
+    # e.g. get_template_parents("CellmlAdapter") -> (("Postprocessing::StreamlineTracer", 0, "DiscretizableInTime"), ...)
+    def get_template_parents(self, name):
+        return self.combinations.get_parents(name)
+
     # adds a RootNode with no childs to undo_stack
     # this function has to be called after initializing this class
     # it is not in __init__ so it can return the Info
@@ -134,87 +100,23 @@ class CPPTree:
     # you have to save them beforehand and parse them after this
     # returns a list of Messages (changed something if no Warning or Error in there)
     def parse_cpp_src(self, problem, validate_semantics=False):
-        new_root = RootNode(self.combinations)
         try:
-            # remove single-line-comments from problem
-            #problem = re.sub(r'(?m)^(.*)//.*\n?', r'\1\n', problem)
-            # mark comments with 'α commentβ' instead of '// comment' so they are easy to parse
-            problem = re.sub(r'(?m)^(.*)//(.*)\n?', r'\1α\2β\n', problem)
-            # TODO maybe also handle multi-line-comments
-
-            # remove LOG(DEBUG) lines
-            problem = re.sub(r'(.*)LOG\(DEBUG\)<<(.*)', '', problem)
-
-            # resolve typedefs (e.g. typedef Mesh::StructuredDeformableOfDimension<3> MeshType;)
-            # get all lines staring with typedef
-            typedef_lines = []
-            for line in problem.split(';'):
-                line = line.lstrip()
-                if line.startswith('typedef'):
-                    typedef_lines.append(line)
-            # remove typedef lines from problem
-            problem = re.sub(r'(.*)typedef (.*);', '', problem)
-            # resolve typedefs
-            for line in typedef_lines:
-                # replace all whitspaces with a simple whitespace
-                line = re.sub(r'\s+', ' ', line)
-                # resolve the typedef by splitting the typedef-line at the spaces and replacing the strings in problem
-                parts = line.split(' ')
-                problem = problem.replace(parts[2], parts[1])
-
-            # replace newlines tabs and spaces with spaces
-            problem = re.sub(r'\s+', ' ', problem)
-
-            # isolate problem
-            problem = problem.split('settings(argc, argv);')[1]
-            problem = re.compile(
-                r'>([^>]*)\(settings\);').split(problem)[0] + '>'
-            problem = re.compile(
-                r' ([A-Za-z]*)\(settings\);').split(problem)[0]
-
-            # remove spaces
-            #problem = re.sub(r' ', '', problem)
-
-            # create tree from problem with a simple parser
-            # this populates new_root and its children
-            problem = '<' + problem + '>'
-            stack = []
-            stack.append(Node(self.combinations))
-            comment_mode = False
-            comment_node = stack[0]
-            for char in problem:
-                if comment_mode:
-                    if char == 'β':
-                        comment_mode = False
-                    else:
-                        comment_node.comment = comment_node.comment + char
-                else:
-                    if char == ' ':
-                        pass
-                    elif char == 'α':
-                        comment_mode = True
-                    elif char == '<':
-                        child = Node(self.combinations)
-                        stack[-1].can_have_childs = True
-                        stack[-1].childs.replace_next_placeholder(child)
-                        stack.append(child)
-                        comment_node = child
-                    elif char == ',':
-                        comment_node = stack.pop()
-                        child = Node(self.combinations)
-                        stack[-1].childs.replace_next_placeholder(child)
-                        stack.append(child)
-                    elif char == '>':
-                        stack.pop()
-                        comment_node = stack[-1]
-                        # remove empty child in case of <> we have can_have_childs for that
-                        if stack[-1].childs.get_real_childs()[0].name == "":
-                            stack[-1].childs.clear()
-                    else:
-                        stack[-1].name = stack[-1].name + char
-
-            child = stack[0].childs.get_real_childs()[0]
-            new_root.childs.replace_next_placeholder(child)
+            # the same source could have been parsed before
+            new_root = self.parse_cache.get('cpp', problem)
+            if new_root == None:
+                new_root = RootNode(self.combinations)
+
+                # split the source into tokens, isolate the problem and resolve its typedefs and using-aliases
+                # TODO maybe also handle multi-line-comments (they are ignored at the moment)
+                tokens = get_problem_tokens(problem)
+
+                # create tree from the tokens
+                tree = self.create_tree_from_tokens(tokens)
+
+                child = tree.childs.get_real_childs()[0]
+                new_root.childs.replace_next_placeholder(child)
+
+                self.parse_cache.put('cpp', problem, new_root)
 
             if validate_semantics:
                 errors = new_root.validate_cpp_src_recursive()
@@ -229,27 +131,228 @@ class CPPTree:
         except:
             return [Error('failed to parse cpp-src (syntax-error)')]
 
+    # creates a tree from tokens (see cpp_lexer.py) with a simple parser
+    # the tokens are handled like they were surrounded by < >, so the created nodes are the childs of the returned Node
+    # the positions of the nodes (offset + offsets of their tokens) are stored in their src_start and src_end
+    def create_tree_from_tokens(self, tokens, offset=0):
+        stack = []
+        stack.append(Node(self.combinations))
+        child = Node(self.combinations)
+        stack[0].can_have_childs = True
+        stack[0].childs.replace_next_placeholder(child)
+        stack.append(child)
+        comment_node = child
+        for token in tokens:
+            if token.kind == 'comment':
+                comment_node.comment = comment_node.comment + token.value
+            elif token.value == '<':
+                child = Node(self.combinations)
+                stack[-1].can_have_childs = True
+                stack[-1].childs.replace_next_placeholder(child)
+                stack.append(child)
+                comment_node = child
+            elif token.value == ',':
+                comment_node = stack.pop()
+                child = Node(self.combinations)
+                stack[-1].childs.replace_next_placeholder(child)
+                stack.append(child)
+            elif token.value == '>':
+                stack.pop()
+                comment_node = stack[-1]
+                comment_node.src_end = offset + token.end
+                # remove empty child in case of <> we have can_have_childs for that
+                if stack[-1].childs.get_real_childs()[0].name == "":
+                    stack[-1].childs.clear()
+            else:
+                if stack[-1].src_start == None:
+                    stack[-1].src_start = offset + token.start
+                stack[-1].src_end = offset + token.end
+                stack[-1].name = stack[-1].name + token.value
+        # close the surrounding < >
+        stack.pop()
+        if stack[-1].childs.get_real_childs()[0].name == "":
+            stack[-1].childs.clear()
+        return stack[0]
+
     # returns a string, which contains the generated cpp source-code using the tree and the template.cpp
+    # the source is stored in root.cpp_src and the positions of the nodes in it in their src_start and src_end (used by parse_cpp_src_incremental())
     def __repr__(self):
-        if len(self.undo_stack.get_current_root().childs.get_real_childs()) > 0:
+        root = self.undo_stack.get_current_root()
+        if len(root.childs.get_real_childs()) > 0:
             index = self.cpp_template.find(' problem(settings)')
-            return self.cpp_template[:index] + indent(str(self.undo_stack.get_current_root().childs.get_real_childs()[0]), '  ') + self.cpp_template[index:]
+            top = root.childs.get_real_childs()[0]
+            # this is the same as indent(str(top), '  '), but we know where top starts before it gets created
+            src = self.cpp_template[:index] + '  '
+            if top.comment != '':
+                src = src + '//' + top.comment + '\n  '
+            src = src + top.repr_recursive(1, len(src)) + self.cpp_template[index:]
         else:
-            return self.cpp_template
+            src = self.cpp_template
+        root.cpp_src = src
+        return src
+
+    # parses only the part of problem that changed since the source was generated the last time (root.cpp_src, see __repr__())
+    # the smallest node that contains the whole change is parsed again and replaces the old node in the current tree
+    # all other nodes stay as they are (with their python-settings), the python-settings of the old node are applied to the new one
+    # returns a list of Messages like parse_cpp_src() or None if the change can't be parsed on its own (then parse_cpp_src() has to be used)
+    def parse_cpp_src_incremental(self, problem, validate_semantics=False):
+        root = self.undo_stack.get_current_root()
+        old_src = root.cpp_src
+        if old_src == None or len(root.childs.get_real_childs()) == 0:
+            return None
+        if problem == old_src:
+            return [Warning('no changes found in cpp-src')]
+
+        # old_src[change_start:change_end] got replaced with problem[change_start:change_end + delta]
+        change_start = get_common_prefix_length(old_src, problem)
+        suffix_length = get_common_suffix_length(old_src[change_start:], problem[change_start:])
+        change_end = len(old_src) - suffix_length
+        delta = len(problem) - len(old_src)
+
+        # find the smallest node that contains the change
+        node = root.childs.get_real_childs()[0]
+        if node.src_start == None or not (node.src_start <= change_start and change_end <= node.src_end):
+            return None
+        found = True
+        while found:
+            found = False
+            for child in node.childs.get_real_childs():
+                if child.src_start != None and child.src_start <= change_start and change_end <= child.src_end:
+                    node = child
+                    found = True
+                    break
+
+        # parse the new source of node, if this does not result in exactly one node, try it with the parent
+        # (e.g. if a template_argument got added after the last one in node)
+        while not isinstance(node, RootNode):
+            node_src = problem[node.src_start:node.src_end + delta]
+            new_node = None
+            try:
+                tokens = tokenize_cpp_src(node_src)
+                # everything else (e.g. ; or typedef) needs the whole source
+                for token in tokens:
+                    if token.kind == 'string' or (token.kind == 'punct' and not token.value in '<,>') or token.value == 'typedef' or token.value == 'using':
+                        return None
+                # everything after the last > of the problem is the name of the variable (see get_problem_tokens())
+                if isinstance(node.parent, RootNode) and old_src[node.src_end - 1] == '>' and not node_src.endswith('>'):
+                    return None
+                # the comments before and after a node belong to other nodes
+                # and the whole source has to be one node (e.g. not if a > got deleted or added)
+                if len(tokens) > 0 and tokens[0].kind != 'comment' and tokens[-1].kind != 'comment' and is_template_balanced(tokens):
+                    tree = self.create_tree_from_tokens(tokens, node.src_start)
+                    if len(tree.childs.get_real_childs()) == 1 and tree.comment == '':
+                        new_node = tree.childs.get_real_childs()[0]
+            except:
+                pass
+            if new_node != None:
+                break
+            node = node.parent
+        if isinstance(node, RootNode):
+            return None
+
+        # the comment of node is outside of its source
+        new_node.comment = node.comment
+        if new_node.compare_cpp(node):
+            return [Warning('no changes found in cpp-src')]
+
+        parent = node.parent
+        if validate_semantics:
+            # validate the whole tree with the new node in it
+            parent.childs.replace(node, new_node)
+            errors = root.validate_cpp_src_recursive()
+            parent.childs.replace(new_node, node)
+            if errors:
+                return errors
+
+        self.undo_stack.duplicate_current_state()
+        parent.childs.replace(node, new_node)
+        try:
+            # apply the python-settings of the old node to the new one
+            python_settings = PythonSettings()
+            python_settings.config_dict = node.get_python_settings_dict_recursive()
+            messages = new_node.parse_python_settings(python_settings, keep_entries_that_have_no_default=True)
+            new_node.insert_missing_default_python_settings_deactivated(root.settings_dict)
+        except:
+            # e.g. new_node is an unknown template and has no default python-settings
+            new_node.delete_python_settings_recursive()
+            messages = [Warning('failed to apply the python-settings of the old ' + str(node.name) + ' to ' + str(new_node.name))]
+
+        self.move_src_positions(new_node, node.src_end, delta)
+        root.cpp_src = problem
+
+        return [Info('cpp-src parsed successfully (only ' + str(new_node.name) + ' was parsed again)')] + messages
+
+    # moves the positions of all nodes of the current tree that end at or after end by delta (except the nodes of skip_node)
+    # the nodes that contain end only get a new src_end
+    def move_src_positions(self, skip_node, end, delta):
+        root = self.undo_stack.get_current_root()
+        stack = list(root.childs.get_real_childs())
+        while stack:
+            n = stack.pop()
+            if n == skip_node or n.src_start == None:
+                continue
+            if n.src_start >= end:
+                n.src_start = n.src_start + delta
+                n.src_end = n.src_end + delta
+            elif n.src_end >= end:
+                # n contains skip_node
+                n.src_end = n.src_end + delta
+            stack.extend(n.childs.get_real_childs())
+
+    # generates the source of node again (e.g. after one of its childs got replaced) and replaces its old source in root.cpp_src
+    # the edit is added to cpp_src_edits, so the gui only has to change this part of the buffer (see get_cpp_src_edits())
+    # if node has no position in root.cpp_src, the next get_cpp_src_edits() returns None and the whole source has to be generated again
+    def update_cpp_src(self, node):
+        root = self.undo_stack.get_current_root()
+        if root.cpp_src == None or isinstance(node, RootNode) or node.src_start == None:
+            self.cpp_src_edits = None
+            return
+        depth = 0
+        n = node
+        while not isinstance(n, RootNode):
+            depth = depth + 1
+            n = n.parent
+        start = node.src_start
+        end = node.src_end
+        src = node.repr_recursive(depth, start)
+        delta = len(src) - (end - start)
+        self.move_src_positions(node, end, delta)
+        if self.cpp_src_edits == None or self.cpp_src_edits_root != root:
+            self.cpp_src_edits = []
+            self.cpp_src_edits_root = root
+            self.cpp_src_edits_base = root.cpp_src
+        self.cpp_src_edits.append((start, end, src))
+        root.cpp_src = root.cpp_src[:start] + src + root.cpp_src[end:]
+
+    # returns the list of edits (start, end, text) that change old_src into the current source, they have to be applied in this order
+    # old_src is the source that was shown before (e.g. the text of the buffer of the gui)
+    # returns None if the edits don't fit to old_src, then the whole source has to be generated again (str(cpp_tree))
+    # the edits are removed, so they are only returned once
+    def get_cpp_src_edits(self, old_src):
+        edits = self.cpp_src_edits
+        root = self.undo_stack.get_current_root()
+        self.cpp_src_edits = None
+        if edits == None or self.cpp_src_edits_root != root or self.cpp_src_edits_base != old_src:
+            return None
+        return edits
 
     # replace a node in the tree with another node
     # it also inserts deactivated defaults
     def replace_node(self, node, replacement_node):
         self.undo_stack.duplicate_current_state()
-        node.parent.childs.replace(node, replacement_node)
+        parent = node.parent
+        parent.childs.replace(node, replacement_node)
         replacement_node.insert_missing_default_python_settings_deactivated(self.undo_stack.get_current_root().settings_dict)
         replacement_node.activate_all_default_python_settings(self.undo_stack.get_current_root().settings_dict)
+        self.update_cpp_src(parent)
         return Info('replaced node with ' + str(replacement_node.name))
 
     # delete a node from the tree
     def delete_node(self, node):
         self.undo_stack.duplicate_current_state()
-        node.parent.childs.delete(node)
+        parent = node.parent
+        parent.childs.delete(node)
+        self.update_cpp_src(parent)
         return Info('deleted node ' + str(node.name))
 
     # remove a setting from its parent and reapply the settings
@@ -267,11 +370,18 @@ class CPPTree:
         try:
             if node:
                 python_settings = PythonSettings()
-                python_settings.config_dict = SettingsDict(settings)
+                python_settings.config_dict = self.parse_cache.get('settings_dict', settings)
+                if python_settings.config_dict == None:
+                    # parsed like PythonSettings parses the config
+                    python_settings.config_dict = SettingsDict(settings, compact_numeric_lists=True)
+                    self.parse_cache.put('settings_dict', settings, python_settings.config_dict)
                 n = node
                 recurse_childs = False
             else:
-                python_settings = PythonSettings(settings)
+                python_settings = self.parse_cache.get('python', settings)
+                if python_settings == None:
+                    python_settings = PythonSettings(settings)
+                    self.parse_cache.put('python', settings, python_settings)
                 n = self.undo_stack.get_current_root()
                 recurse_childs = True
         except:
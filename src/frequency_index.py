@@ -0,0 +1,89 @@
+import sys
+import json
+import argparse
+
+from catalog import frequency_index_path
+from cpp_tree import CPPTree
+from helpers import Error
+from node import get_real_childs
+from tree_walk import walk_preorder
+from batch import find_cpp_files, map_files
+
+# builds the frequency index: how often each template is used in each slot of another template in a corpus of examples
+# get_possible_replacements() lists the candidates of a slot in the order of the index, the most used first
+# run it from this directory (like gui.py) whenever the examples change: python3 frequency_index.py ../../opendihu/examples
+# the index is written to replacement_frequencies.json next to this file, the catalog reads it when it ranks the first slot
+
+
+# returns {parent: {slot index: {name: count}}} for all template_arguments in the file at path
+# only names that the slot accepts are counted (no Integers, they are not listed as candidates)
+# files that can't be read or parsed without Errors are not counted (None)
+def count_template_arguments(path):
+    try:
+        with open(path, 'r') as file:
+            src = file.read()
+    except Exception:
+        return None
+    cpp_tree = CPPTree()
+    cpp_tree.load_empty_simulation()
+    messages = cpp_tree.parse_cpp_src(src)
+    if any(isinstance(message, Error) for message in messages):
+        return None
+    combinations = cpp_tree.combinations
+    counts = {}
+    for (node, _depth) in walk_preorder(cpp_tree.undo_stack.get_current_root(), get_real_childs):
+        for child in node.childs.get_real_childs():
+            try:
+                int(child.name)
+                continue
+            except ValueError:
+                pass
+            if combinations.accepts(node.name, child.slot_index, child.name):
+                slot_counts = counts.setdefault(node.name, {}).setdefault(child.slot_index, {})
+                slot_counts[child.name] = slot_counts.get(child.name, 0) + 1
+    return counts
+
+
+# returns the frequency index of all .cpp files in paths (directories are searched recursively), parsed with jobs processes
+# the frequencies are stored as {parent: [{name: count} for every slot]}, so the index can be stored as json
+def build_frequency_index(paths, jobs=None):
+    files = find_cpp_files(paths)
+    results = map_files(count_template_arguments, files, jobs)
+
+    frequencies = {}
+    for counts in results:
+        if counts == None:
+            continue
+        for parent, slots in counts.items():
+            parent_frequencies = frequencies.setdefault(parent, [])
+            for slot_index, slot_counts in slots.items():
+                while len(parent_frequencies) <= slot_index:
+                    parent_frequencies.append({})
+                for name, count in slot_counts.items():
+                    parent_frequencies[slot_index][name] = parent_frequencies[slot_index].get(name, 0) + count
+    return {
+        'files': len(files),
+        'files_counted': len([counts for counts in results if counts != None]),
+        'frequencies': frequencies,
+    }
+
+
+def write_frequency_index(path, frequency_index):
+    with open(path, 'w') as file:
+        json.dump(frequency_index, file, separators=(',', ':'), sort_keys=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='count how often each template is used in each slot of the example.cpp files, to rank the replacement candidates')
+    parser.add_argument('paths', nargs='+', help='.cpp files or directories that get searched for .cpp files')
+    parser.add_argument('-j', '--jobs', type=int, default=None, help='number of processes (default: number of cpus)')
+    parser.add_argument('-o', '--output', default=frequency_index_path, help='where to write the index (default: ' + frequency_index_path + ')')
+    args = parser.parse_args(argv)
+
+    frequency_index = build_frequency_index(args.paths, args.jobs)
+    write_frequency_index(args.output, frequency_index)
+    print('counted ' + str(frequency_index['files_counted']) + ' of ' + str(frequency_index['files']) + ' files, index written to ' + args.output)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
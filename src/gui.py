@@ -199,6 +199,7 @@ class NodeReplaceWindow(Gtk.Window):
             self.connect('key-press-event', on_keypress)
         else:
             # no Integer
+            # the rows hold the ReplacementCandidates, a Node is only created for the one that gets replaced
             def listbox_create_widget(node_line):
                 listbox_row = ListBoxRowWithNode()
                 listbox_row.add_node(node_line.node)
@@ -223,7 +224,7 @@ class NodeReplaceWindow(Gtk.Window):
             # grid.add(scroll)
 
             def on_button_replace(_):
-                replacement = listbox.get_selected_row().node
+                replacement = node.create_replacement(listbox.get_selected_row().node)
                 #replacement.add_missing_default_python_settings(
                 #    main_window.cpp_tree.undo_stack.get_current_root().settings_dict)
                 ret = main_window.cpp_tree.replace_node(node, replacement)
@@ -282,12 +283,36 @@ class MainWindow(Gtk.ApplicationWindow):
         self.redraw_python()
 
     def redraw_textview_python_code(self):
-        text = str(self.cpp_tree.get_python_settings())
-        self.text_view_python_code.get_buffer().set_text(text)
+        buffer = self.text_view_python_code.get_buffer()
+        buffer.set_text('')
+        # insert the settings in chunks while they get written, so the whole text is not created first
+        def insert_chunk(chunk):
+            buffer.insert(buffer.get_end_iter(), chunk)
+        self.cpp_tree.get_python_settings().write(insert_chunk)
+        buffer.set_modified(False)
 
     def redraw_textview_cpp_code(self):
-        text = str(self.cpp_tree)
-        self.text_view_cpp_code.get_buffer().set_text(text)
+        buffer = self.text_view_cpp_code.get_buffer()
+        text_bounds = buffer.get_bounds()
+        text = buffer.get_text(text_bounds[0], text_bounds[1], True)
+        # only change the parts of the buffer that changed (e.g. after replace_node), so a large buffer does not get highlighted again
+        edits = self.cpp_tree.get_cpp_src_edits(text)
+        if edits == None:
+            buffer.set_text(str(self.cpp_tree))
+        else:
+            for (start, end, edit_text) in edits:
+                buffer.delete(buffer.get_iter_at_offset(start), buffer.get_iter_at_offset(end))
+                buffer.insert(buffer.get_iter_at_offset(start), edit_text)
+        buffer.set_modified(False)
+
+    # selects the source of node in the cpp-code (if the code was not changed since it got generated)
+    def textview_cpp_code_select_node(self, node):
+        buffer = self.text_view_cpp_code.get_buffer()
+        if node == None or node.src_start == None or buffer.get_modified():
+            return
+        start = buffer.get_iter_at_offset(node.src_start)
+        buffer.select_range(start, buffer.get_iter_at_offset(node.src_end))
+        self.text_view_cpp_code.scroll_to_iter(start, 0.1, False, 0, 0)
 
     def redraw_treeview_cpp(self):
         # get currently selected index
@@ -433,6 +458,11 @@ class MainWindow(Gtk.ApplicationWindow):
                     file.write(text)
                     self.log_append_message(
                         Info('saved c++-code to ' + dialog.get_filename()))
+                elif not self.text_view_python_code.get_buffer().get_modified():
+                    # the text is the same as the settings, so they can be written directly to the file
+                    self.cpp_tree.get_python_settings().write(file)
+                    self.log_append_message(
+                        Info('saved python-code to ' + dialog.get_filename()))
                 else:
                     text_bounds = self.text_view_python_code.get_buffer().get_bounds()
                     text = self.text_view_python_code.get_buffer().get_text(
@@ -572,6 +602,8 @@ class MainWindow(Gtk.ApplicationWindow):
                 v = '{..}'
             elif isinstance(settings.value, SettingsList):
                 v = '[..]'
+            elif isinstance(settings.value, SettingsUnparsedContainer) or isinstance(settings.value, SettingsNumericList):
+                v = settings.value.get_summary()
             grid.add(Gtk.Label(label=settings.key + ' : ' + v))
             if settings.is_unknown:
                 color = Gdk.RGBA(1, 1, 0, .5)
@@ -586,6 +618,8 @@ class MainWindow(Gtk.ApplicationWindow):
                 v = '{..}'
             elif isinstance(settings.value, SettingsList):
                 v = '[..]'
+            elif isinstance(settings.value, SettingsUnparsedContainer) or isinstance(settings.value, SettingsNumericList):
+                v = settings.value.get_summary()
             grid.add(Gtk.Label(label=v))
         elif isinstance(settings, SettingsChildPlaceholder):
             grid.add(Gtk.Label(label=settings.comment))
@@ -612,6 +646,23 @@ class MainWindow(Gtk.ApplicationWindow):
                 grid.add(button_open_doc)
         except: pass
 
+        # large lists and dicts are not parsed and lists of numbers are stored compactly until they get expanded
+        if (isinstance(settings, SettingsDictEntry) or isinstance(settings, SettingsListEntry)) and (isinstance(settings.value, SettingsUnparsedContainer) or isinstance(settings.value, SettingsNumericList)):
+            grid.add(Gtk.Label(label=' '))
+            button_expand_settings = Gtk.Button()
+            button_expand_settings.set_tooltip_text('show all entries')
+            icon = Gio.ThemedIcon(name="list-add-symbolic")
+            image = Gtk.Image.new_from_gicon(icon, Gtk.IconSize.BUTTON)
+            button_expand_settings.add(image)
+            def on_button_expand_settings(_):
+                if self.check_python_treeview_for_unapplied_code():
+                    return
+                self.cpp_tree.undo_stack.duplicate_current_state()
+                settings.value = settings.value.parse()
+                self.redraw_python()
+            button_expand_settings.connect("clicked", on_button_expand_settings)
+            grid.add(button_expand_settings)
+
         if activated and not isinstance(settings, SettingsChildPlaceholder):
             grid.add(Gtk.Label(label=' '))
             button_delete_settings = Gtk.Button()
@@ -705,6 +756,15 @@ class MainWindow(Gtk.ApplicationWindow):
         text_bounds = self.text_view_cpp_code.get_buffer().get_bounds()
         text = self.text_view_cpp_code.get_buffer().get_text(
             text_bounds[0], text_bounds[1], True)
+        # try to only parse the changed part, this keeps all other nodes and their python-settings
+        rets = self.cpp_tree.parse_cpp_src_incremental(
+            text, validate_semantics=self.checkbox_validate_semantics.get_active())
+        if rets != None:
+            self.log_append_message(rets)
+            # the first message is an Info if the tree got changed
+            if isinstance(rets[0], Info):
+                self.redraw_all()
+            return
         rets = self.cpp_tree.parse_cpp_src(
             text, validate_semantics=self.checkbox_validate_semantics.get_active())
         self.log_append_message(rets)
@@ -991,6 +1051,8 @@ class MainWindow(Gtk.ApplicationWindow):
                         return
                 else:
                     return
+            if row != None:
+                self.textview_cpp_code_select_node(row.node)
             self.redraw_treeview_python()
         self.cpp_treeview_listbox.connect('row-selected', row_clicked)
 
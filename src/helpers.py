@@ -1,4 +1,5 @@
 import sys
+import copy
 
 # use printe() instead of print() to print errors to stderr instead of stdout
 
@@ -48,3 +49,46 @@ class Warning(Message):
 
 def indent(lines, indentation):
     return indentation + lines.replace('\n', '\n' + indentation)
+
+# names of the __slots__ of cls and all its base classes (private names are mangled like python does it)
+_slot_names = {}
+def get_slot_names(cls):
+    names = _slot_names.get(cls)
+    if names == None:
+        names = []
+        for c in reversed(cls.__mro__):
+            for name in c.__dict__.get('__slots__', ()):
+                if name.startswith('__'):
+                    name = '_' + c.__name__.lstrip('_') + name
+                names.append(name)
+        names = tuple(names)
+        _slot_names[cls] = names
+    return names
+
+# deepcopy of an object with __slots__ (and the items if it is a list), use it as __deepcopy__()
+# the default deepcopy for objects without __dict__ is a lot slower and the UndoStack deepcopies whole trees of them
+# strings, numbers and None don't get copied and slots that are not set stay unset
+# the slots in skip (e.g. caches that the copy can build again) are not copied and stay unset
+# the copy is of type cls (a class with the same slots) if it is given, otherwise of the type of obj
+_immutable_types = (str, bytes, int, float, bool, type(None))
+def deepcopy_slots(obj, memo, skip=(), cls=None):
+    if cls == None:
+        cls = type(obj)
+    new = cls.__new__(cls)
+    memo[id(obj)] = new
+    for name in get_slot_names(cls):
+        if name in skip:
+            continue
+        try:
+            value = getattr(obj, name)
+        except AttributeError:
+            continue
+        if not type(value) in _immutable_types:
+            value = copy.deepcopy(value, memo)
+        setattr(new, name, value)
+    if isinstance(obj, list):
+        for item in obj:
+            if not type(item) in _immutable_types:
+                item = copy.deepcopy(item, memo)
+            new.append(item)
+    return new
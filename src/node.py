@@ -1,18 +1,32 @@
 import copy
+import hashlib
 
-from helpers import printe, indent, Error, Info, Warning
+from helpers import printe, indent, deepcopy_slots, Error, Info, Warning
+from tree_walk import walk_preorder, walk_postorder, walk_enter_exit
 from python_settings.python_settings import *
 
 class Childs():
+    __slots__ = ('node', 'populated', '__childs', '__real_childs', 'combinations', 'childs_count_needed')
     def __init__(self, node):
         self.node = node
         # node.name is not populated yet, so we can't populate self.__childs with placeholders
         self.populated = False
+        # tuple of the childs that are no PlaceholderNodes, None if it has to be created again (after a change of self.__childs)
+        self.__real_childs = None
+
+    def __deepcopy__(self, memo):
+        return deepcopy_slots(self, memo)
+
+    # has to be called after every change of self.__childs
+    def __changed(self):
+        self.__real_childs = None
+        self.node.invalidate_caches()
 
     def populate(self):
         self.populated = True
 
         self.__childs = []
+        self.__real_childs = None
         self.combinations = self.node.combinations
 
         if not isinstance(self.node, PlaceholderNode) and self.node.name in self.node.combinations and "template_arguments" in self.node.combinations[self.node.name]:
@@ -35,37 +49,48 @@ class Childs():
             self.__childs[i] = (PlaceholderNode(
                 self.combinations, needed=False))
         self.__childs[i].parent = self.node
+        self.__childs[i].slot_index = i
+        self.__changed()
 
+    # the returned list must not be changed, use the functions of this class for that
     def get_childs(self):
         if not self.populated:
             self.populate()
         return self.__childs
 
+    # returns a tuple of the childs without the PlaceholderNodes
+    # the tuple is cached until the childs change, so calling this in loops is cheap
     def get_real_childs(self):
+        if self.__real_childs == None:
+            if not self.populated:
+                self.populate()
+            self.__real_childs = tuple(child for child in self.__childs if not isinstance(child, PlaceholderNode))
+        return self.__real_childs
+
+    # returns the index of child in the childs (the template_argument it is used for) or None if it is no child
+    # every child knows its slot_index, so this does not have to search the childs
+    def get_index(self, child):
         if not self.populated:
             self.populate()
-        ret = []
-        for child in self.__childs:
-            if not isinstance(child, PlaceholderNode):
-                ret.append(child)
-        return ret
+        i = child.slot_index
+        if i != None and i < len(self.__childs) and self.__childs[i] is child:
+            return i
+        return None
 
     def delete(self, child):
-        if not self.populated:
-            self.populate()
-        for i in range(len(self.__childs)):
-            if self.__childs[i] == child:
-                self.__add_placeholder_i(i)
+        i = self.get_index(child)
+        if i != None:
+            self.__add_placeholder_i(i)
 
     def replace(self, child_old, child_new):
-        if not self.populated:
-            self.populate()
         child_new.parent = self.node
-        for i in range(len(self.__childs)):
-            if self.__childs[i] == child_old:
-                self.__childs[i] = child_new
-                return
-        #printe('failed to replace node')
+        i = self.get_index(child_old)
+        if i != None:
+            self.__childs[i] = child_new
+            child_new.slot_index = i
+            self.__changed()
+        #else:
+        #    printe('failed to replace node')
 
     # normally gets called while parsing cpp-code
     def replace_next_placeholder(self, child):
@@ -77,24 +102,119 @@ class Childs():
                 return
         # force adding the child if no PlaceholderNodes are left in self.__childs (in case of unknown templates)
         child.parent = self.node
+        child.slot_index = len(self.__childs)
         self.__childs.append(child)
+        self.__changed()
 
     def clear(self):
         self.populate()
+        self.__changed()
+
+# get_childs() functions for the walkers of tree_walk
+def get_real_childs(node):
+    return node.childs.get_real_childs()
+
+def get_real_childs_without_cpp_hash(node):
+    return [child for child in node.childs.get_real_childs() if child.cpp_hash == None]
+
+# the childs of unknown templates are not validated
+def get_real_childs_without_validation_errors(node):
+    if node.name not in node.combinations:
+        return ()
+    return [child for child in node.childs.get_real_childs() if child.validation_errors == None]
+
+# only the childs, for that insert_missing_default_python_settings_deactivated() has seen or set a child_placeholder
+# if e.g. a dict in which a SettingsChildPlaceholder should be is set to an external variable,
+# we do not want to add those settings again to the childnode
+def get_childs_with_placeholders(node):
+    childs = []
+    for child in node.childs_with_placeholders:
+        # ignore childs that have an Integer as name
+        try:
+            int(child.name)
+        except:
+            childs.append(child)
+    return childs
 
 # this class represents a Node in the structure tree (Example.root e.g. is such a Node)
+# Nodes, their Childs and python-settings use __slots__ instead of a __dict__, because the UndoStack keeps many copies of them
 class Node:
+    __slots__ = ('combinations', '_name', '_comment', '_can_have_childs', 'childs', 'parent', 'slot_index', 'src_start', 'src_end',
+                 'cpp_hash', 'validation_errors', 'settings_dict', 'settings_dict_prefix', 'settings_dict_postfix', 'childs_with_placeholders')
     def __init__(self, combinations):
         self.combinations = combinations
-        self.name = ''
-        self.comment = ''
-        self.can_have_childs = False
+        self._name = ''
+        self._comment = ''
+        self._can_have_childs = False
         self.childs = Childs(self)
 
         self.parent = None
+        # hash over the cpp of this node and its childs (see get_cpp_hash()), None if it has to be computed again
+        self.cpp_hash = None
+        # tuple of the Errors of this subtree (see validate_cpp_src_recursive()), None if they have to be computed again
+        self.validation_errors = None
+        # index of this node in the childs of parent (see Childs.get_index())
+        self.slot_index = None
+
+        # position of this node in the cpp-source it was parsed from or generated to (see CPPTree.parse_cpp_src_incremental())
+        self.src_start = None
+        self.src_end = None
 
         self.settings_dict = SettingsDict()
-        self.settings_container_default = None
+
+    def __deepcopy__(self, memo):
+        return deepcopy_slots(self, memo)
+
+    # name, comment and can_have_childs are part of the cpp_hash, so changing them has to invalidate it (and the validation_errors)
+    @property
+    def name(self):
+        return self._name
+
+    @name.setter
+    def name(self, name):
+        self._name = name
+        self.invalidate_caches()
+
+    @property
+    def comment(self):
+        return self._comment
+
+    @comment.setter
+    def comment(self, comment):
+        self._comment = comment
+        self.invalidate_caches()
+
+    @property
+    def can_have_childs(self):
+        return self._can_have_childs
+
+    @can_have_childs.setter
+    def can_have_childs(self, can_have_childs):
+        self._can_have_childs = can_have_childs
+        self.invalidate_caches()
+
+    # removes the cpp_hash and the validation_errors of this node and all its parents
+    # (if a node has neither, its parents don't have them either, because they are computed from the ones of the childs)
+    def invalidate_caches(self):
+        node = self
+        while node != None and (node.cpp_hash != None or node.validation_errors != None):
+            node.cpp_hash = None
+            node.validation_errors = None
+            node = node.parent
+
+    # returns a hash (bytes) over name, comment, can_have_childs and the real childs of this node (recursively)
+    # two nodes have the same cpp_hash if compare_cpp() would have compared all of this, it is cached until one of them changes
+    def get_cpp_hash(self):
+        if self.cpp_hash == None:
+            # only the nodes without a cached cpp_hash get visited, their childs get a hash first
+            for (node, _depth) in walk_postorder(self, get_real_childs_without_cpp_hash):
+                h = hashlib.blake2b(digest_size=16)
+                # the lengths make the hash unambiguous
+                h.update((str(len(node._name)) + ':' + node._name + str(len(node._comment)) + ':' + node._comment + str(int(node._can_have_childs))).encode('utf-8', 'surrogatepass'))
+                for child in node.childs.get_real_childs():
+                    h.update(child.cpp_hash)
+                node.cpp_hash = h.digest()
+        return self.cpp_hash
 
     def get_int_replacement(self, integer):
         replacement = Node(self.combinations)
@@ -106,75 +226,75 @@ class Node:
         if not self.parent:
             return ''
         try:
-            for i in range(len(self.parent.childs.get_childs())):
-                if self == self.parent.childs.get_childs()[i]:
-                    child_index = i
-                    break
+            child_index = self.parent.childs.get_index(self)
             (node_description,
              _possible_node_names) = self.combinations[self.parent.name]["template_arguments"][child_index]
             return node_description
         except:
             return 'UNKNOWN'
 
+    # returns (description of the slot of this node, tuple of ReplacementCandidates for this slot)
+    # the candidates are cached by the catalog and sorted by their occurence in the examples (see frequency_index.py)
+    # use create_replacement() to get a Node for one of them
     def get_possible_replacements(self):
         # special case for rootnode
         if not self.parent:
             return []
-        for i in range(len(self.parent.childs.get_childs())):
-            if self == self.parent.childs.get_childs()[i]:
-                child_index = i
-                break
-        (possible_node_description,
-         possible_node_names) = self.combinations[self.parent.name]["template_arguments"][child_index]
-        possible_replacements = []
-        for name in possible_node_names:
-            possible_replacement = Node(self.combinations)
-            possible_replacement.name = name
-            # possible_replacement.add_missing_default_python_settings()
-            try:  # try because of Integer name not found in self.combinations
-                if "template_arguments" in self.combinations[name]:
-                    possible_replacement.can_have_childs = True
-            except:
-                pass
-            possible_replacements.append(possible_replacement)
-        # TODO sort by occurence in examples
-        return (possible_node_description, possible_replacements)
+        child_index = self.parent.childs.get_index(self)
+        return self.combinations.get_replacements(self.parent.name, child_index)
+
+    # returns a new Node for a candidate of get_possible_replacements()
+    def create_replacement(self, candidate):
+        replacement = Node(self.combinations)
+        replacement.name = candidate.name
+        replacement.can_have_childs = candidate.can_have_childs
+        return replacement
 
     # this is not in __init__(), because self.name (used here) gets defined later
+    # the returned defaults belong to the shared catalog, they are read-only (copy.deepcopy() them to get defaults that can be changed)
+    # (they are also not stored in this Node, so they don't get copied by the deepcopys of the UndoStack)
+    # the catalog parses the defaults of a template on the first call for it and keeps them for all later calls
     def get_default_python_settings_dict(self):
-        if self.settings_container_default == None:
-            try:
-                self.settings_container_default = self.combinations[self.name]["python_options"]
-            except:
-                #printe('no python_options found for ' + str(self.name))
-                # return None if nothing found
-                self.settings_container_default = None
-        return self.settings_container_default
+        try:
+            return self.combinations[self.name]["python_options"]
+        except:
+            #printe('no python_options found for ' + str(self.name))
+            # return None if nothing found
+            return None
 
     # returns self.settings_dict with SettingsChildPlaceholders replaced with child dicts
     def get_python_settings_dict_recursive(self):
-        # deepcopy self.settings_dict so we don't replace the SettingsChildPlaceholders in it
-        own_dict = copy.deepcopy(self.settings_dict)
-        for child in self.childs.get_real_childs():
-            #print('child: ' + child.name)
-            # for every child replace the ### CHILD ### placeholder with the childs dict
-            try:
-                child_dict = child.get_python_settings_dict_recursive()
-                #print('replacing ' + child.name + ' placeholder with:\n' + str(child_dict))
-                own_dict.replaceChildPlaceholder(child_dict)
-            except:
-                pass
-                #print('failed to replace SettingsChildPlaceholder ' + child.name)
-        return own_dict
+        # the dicts of the childs are created first (in post-order), id(node) -> dict
+        dicts = {}
+        for (node, _depth) in walk_postorder(self, get_real_childs):
+            # deepcopy node.settings_dict so we don't replace the SettingsChildPlaceholders in it
+            own_dict = copy.deepcopy(node.settings_dict)
+            for child in node.childs.get_real_childs():
+                # for every child replace the ### CHILD ### placeholder with the childs dict
+                child_dict = dicts.pop(id(child))
+                try:
+                    own_dict.replaceChildPlaceholder(child_dict)
+                except:
+                    pass
+                    #print('failed to replace SettingsChildPlaceholder ' + child.name)
+            dicts[id(node)] = own_dict
+        return dicts[id(self)]
 
     # inserts deactivated placeholders for all possible settings into self.settings_dict
     def insert_missing_default_python_settings_deactivated(self, settings_global_dict, recurse_childs=True, self_settings_container=None, settings_container_default=None):
         # counter for inserted settings
         changes = 0
-        recurse_childs_at_the_end = False
 
         # init stuff and recurse childs if we are on the outer level of a node
         if self_settings_container == None and settings_container_default == None:
+            if recurse_childs:
+                # the childs are handled in pre-order with an explicit stack, so deep trees don't hit the recursion limit
+                for (node, _depth) in walk_preorder(self, get_childs_with_placeholders):
+                    changes = changes + node.insert_missing_default_python_settings_deactivated(
+                        settings_global_dict=settings_global_dict, recurse_childs=False)
+                return changes
+
+            self.childs_with_placeholders = []
             # init settings_container_default
             settings_container_default = self.get_default_python_settings_dict()
             if settings_container_default == None:
@@ -186,11 +306,6 @@ class Node:
                 self.settings_dict = SettingsDict()
             self_settings_container = self.settings_dict
 
-            self.childs_with_placeholders = []
-            # recurse childs
-            if recurse_childs:
-                recurse_childs_at_the_end = True
-
         # handle SettingsList
         if isinstance(self_settings_container, SettingsList) and isinstance(settings_container_default, SettingsList):
             # if list is empty -> add all list entries + list_comprehension
@@ -210,7 +325,8 @@ class Node:
                 entry.parent = self_settings_container
 
                 if isinstance(entry, SettingsListEntry):
-                    if not isinstance(entry.value, str):
+                    # SettingsUnparsedContainers and SettingsNumericLists are values like strings (they are shared by the copies, so they can't have a parent)
+                    if not isinstance(entry.value, str) and not isinstance(entry.value, SettingsUnparsedContainer) and not isinstance(entry.value, SettingsNumericList):
                         # add parent_info
                         entry.value.parent = entry
 
@@ -243,7 +359,8 @@ class Node:
                             placeholder_already_added = True
                             break
                     if not placeholder_already_added:
-                        self_settings_container.append(entry)
+                        # copy the placeholder, entry belongs to the shared catalog
+                        self_settings_container.append(copy.copy(entry))
 
                 elif isinstance(entry, SettingsDictEntry):
                     # add default-entry if we don't have the key already
@@ -318,7 +435,7 @@ class Node:
                     except: pass
 
                     # recurse all keys that are no strings, those are SettingsDict and SettingsList
-                    if not isinstance(entry.value, str) and settings_container_default.has_key(entry.key):
+                    if not isinstance(entry.value, str) and not isinstance(entry.value, SettingsUnparsedContainer) and not isinstance(entry.value, SettingsNumericList) and settings_container_default.has_key(entry.key):
                         # add parent_info
                         entry.value.parent = entry
 
@@ -327,21 +444,6 @@ class Node:
                         changes = changes + self.insert_missing_default_python_settings_deactivated(
                             self_settings_container=entry.value, recurse_childs=recurse_childs, settings_container_default=settings_container_default_recurse, settings_global_dict=settings_global_dict)
 
-        if recurse_childs_at_the_end:
-            # only recurse childs, for that we have seen or set a child_placeholders
-            # if e.g. a dict in which a SettingsChildPlaceholder should be is set to an external variable,
-            # we do not want to add those settings again to the childnode
-            childs_recurse = []
-            for child in self.childs_with_placeholders:
-                # ignore childs that have an Integer as name
-                try:
-                    int(child.name)
-                except:
-                    childs_recurse.append(child)
-            for child in childs_recurse:
-                changes = changes + child.insert_missing_default_python_settings_deactivated(
-                    settings_global_dict=settings_global_dict, recurse_childs=recurse_childs)
-
         # except:
         #    printe('something went wrong while adding missing python-settings')
 
@@ -375,7 +477,8 @@ class Node:
             # if we have multiple entries just use settings_container_default[0] for all of them
             for entry in self_settings_container:
                 if isinstance(entry, SettingsListEntry):
-                    if not isinstance(entry.value, str):
+                    # SettingsUnparsedContainers and SettingsNumericLists are values like strings
+                    if not isinstance(entry.value, str) and not isinstance(entry.value, SettingsUnparsedContainer) and not isinstance(entry.value, SettingsNumericList):
                         settings_container_default_recurse = None
                         try:
                             settings_container_default_recurse = settings_container_default[0].value
@@ -463,7 +566,7 @@ class Node:
                 # recurse levels
                 if isinstance(entry, SettingsDictEntry):
                     # recurse all keys that are no strings, those are SettingsDict and SettingsList
-                    if not isinstance(entry.value, str) and settings_container_default.has_key(entry.key):
+                    if not isinstance(entry.value, str) and not isinstance(entry.value, SettingsUnparsedContainer) and not isinstance(entry.value, SettingsNumericList) and settings_container_default.has_key(entry.key):
                         settings_container_default_recurse = settings_container_default.get_value(
                             entry.key)
                         changes = changes + self.activate_all_default_python_settings(
@@ -486,9 +589,8 @@ class Node:
 
     # delete self.settings_dict recursively
     def delete_python_settings_recursive(self):
-        self.settings_dict = SettingsDict()
-        for child in self.childs.get_real_childs():
-            child.delete_python_settings_recursive()
+        for (node, _depth) in walk_preorder(self, get_real_childs):
+            node.settings_dict = SettingsDict()
 
     # parse PythonSettings and keep prefix and postfix
     # returns a list of Warnings
@@ -669,7 +771,8 @@ class Node:
         # we do this here, to always have the childs on the bottom for consistency
         # TODO maybe append them to self_settings_container after first use and only the not used ones here at the bottom
         for child_placeholder in child_placeholders:
-            self_settings_container.append(child_placeholder)
+            # copy the placeholder, child_placeholder belongs to the shared catalog
+            self_settings_container.append(copy.copy(child_placeholder))
 
         return (rest, warnings)
 
@@ -682,131 +785,150 @@ class Node:
             comment = '//' + self.comment + '\n'
         return comment + self.repr_recursive(0)
 
-    def repr_recursive(self, depth):
-        indentation = '  ' * depth
-        indentation_child = '  ' * (depth + 1)
-        childs_string = ''
-        for i in range(len(self.childs.get_real_childs())):
-            child = self.childs.get_real_childs()[i]
-            #print(child.name + ' : ' + child.comment)
-            comment_string = ''
-            if child.comment != '':
-                comment_string = ' //' + child.comment
-            # add ',' if this is not the last child
-            if i < len(self.childs.get_real_childs()) - 1:
-                comment_string = ',' + comment_string
-            if childs_string == '':
-                childs_string = '\n' + indentation_child + \
-                    child.repr_recursive(depth + 1) + comment_string
-            else:
-                childs_string = childs_string + '\n' + indentation_child + \
-                    child.repr_recursive(depth + 1) + comment_string
-        if childs_string == '':
-            if self.can_have_childs:
-                return self.name + '<>'
+    # if offset (the position of this node in the whole source) is given, the positions of all nodes are stored in src_start and src_end
+    # the tree is walked iteratively, so very deep trees don't hit the recursion limit
+    def repr_recursive(self, depth, offset=None):
+        # the parts get joined at the end, length is the length of the parts so far
+        parts = []
+        length = 0
+        for (node, node_depth, entering) in walk_enter_exit(self, get_real_childs, depth):
+            has_childs = len(node.childs.get_real_childs()) > 0
+            if entering:
+                if node is not self:
+                    part = '\n' + '  ' * node_depth
+                    parts.append(part)
+                    length = length + len(part)
+                if offset != None:
+                    node.src_start = offset + length
+                if has_childs:
+                    part = node.name + '<'
+                elif node.can_have_childs:
+                    part = node.name + '<>'
+                else:
+                    part = node.name
             else:
-                return self.name
-        else:
-            return self.name + '<' + childs_string + '\n' + indentation + '>'
+                part = ''
+                if has_childs:
+                    part = '\n' + '  ' * node_depth + '>'
+                parts.append(part)
+                length = length + len(part)
+                if offset != None:
+                    node.src_end = offset + length
+                if node is self:
+                    break
+                part = ''
+                if node.comment != '':
+                    part = ' //' + node.comment
+                # add ',' if this is not the last child
+                if node is not node.parent.childs.get_real_childs()[-1]:
+                    part = ',' + part
+            parts.append(part)
+            length = length + len(part)
+        return ''.join(parts)
 
     # this function can compare the cpp of this Node to another Node
     # returning True if equal, False otherwise
+    # (name, comment, can_have_childs and all real childs are compared using the cached cpp_hash)
     def compare_cpp(self, node):
-        if self.name != node.name:
-            return False
-        if self.comment != node.comment:
-            #print(self.name + ' : ' + self.comment + ' =! ' + node.comment)
-            return False
-        if self.can_have_childs != node.can_have_childs:
-            return False
-        if len(self.childs.get_real_childs()) != len(node.childs.get_real_childs()):
-            return False
-        for i in range(len(self.childs.get_real_childs())):
-            if self.childs.get_real_childs()[i].compare_cpp(node.childs.get_real_childs()[i]) == False:
-                return False
-        return True
+        return self.get_cpp_hash() == node.get_cpp_hash()
 
     # returns list of Errors or empty list if the tree is a valid combination of templates (non recursive)
+    # the Errors only depend on the names of this node and its parent and on the index of this node,
+    # so the catalog caches them for every combination of these (the gui validates every row on every redraw)
     def validate_cpp_src(self):
-        res = []
         # if not RootNode:
-        if self.parent:
-            try:
-                p_wanted_childs = self.combinations[self.parent.name].get(
-                    "template_arguments", [])
-                p_argument_count_max = len(p_wanted_childs)
-            except:
-                res.append(Error(str(self.parent.name) + ' is unknown'))
-                return res
-            i = 0
-            for child in self.parent.childs.get_childs():
-                if child == self:
-                    break
-                i = i + 1
+        if not self.parent:
+            return []
+        i = self.parent.childs.get_index(self)
+        if i == None:
+            i = len(self.parent.childs.get_childs())
+        key = (self.parent.name, i, self.name)
+        errors = self.combinations.slot_errors.get(key)
+        if errors == None:
+            errors = tuple(self.__validate_cpp_src_slot(i))
+            self.combinations.slot_errors[key] = errors
+        return list(errors)
+
+    # helper function for validate_cpp_src(), i is the index of this node in the childs of its parent
+    def __validate_cpp_src_slot(self, i):
+        res = []
+        try:
+            p_wanted_childs = self.combinations[self.parent.name].get(
+                "template_arguments", [])
+            p_argument_count_max = len(p_wanted_childs)
+        except:
+            res.append(Error(str(self.parent.name) + ' is unknown'))
+            return res
 
+        if i >= p_argument_count_max:
+            res.append(Error(str(self.parent.name) + ' only accepts ' +
+                             str(p_argument_count_max) + ' template_arguments'))
+        else:
             (_template_argument_description,
              possible_template_arguments) = p_wanted_childs[i]
-            if i > p_argument_count_max:
-                res.append(Error(str(self.parent.name) + ' only accepts ' +
-                                 str(p_argument_count_max) + ' template_arguments'))
-            else:
-                if possible_template_arguments == ["Integer"]:
-                    try:
-                        int(self.name)
-                    except:
-                        res.append(
-                            Error(str(self.name) + ' is not an Integer'))
-                elif self.name not in possible_template_arguments:
-                    res.append(Error(str(self.name) + ' is not in the list of possible template_arguments for ' +
-                                     self.parent.name + '\n' + 'possible template_arguments are: ' + str(possible_template_arguments)))
-
+            if possible_template_arguments == ("Integer",):
+                try:
+                    int(self.name)
+                except:
+                    res.append(
+                        Error(str(self.name) + ' is not an Integer'))
+            elif not self.combinations.accepts(self.parent.name, i, self.name):
+                res.append(Error(str(self.name) + ' is not in the list of possible template_arguments for ' +
+                                 self.parent.name + '\n' + 'possible template_arguments are: ' + str(list(possible_template_arguments))))
         return res
 
     # returns list of Errors or empty list if the tree is a valid combination of templates
+    # the Errors of every subtree are cached in validation_errors until the subtree changes,
+    # so after an edit only the changed nodes and their parents are validated again
+    # the Errors are in the same order as with a recursive walk in pre-order:
+    # a child is checked against the template_arguments of its parent right before the childs of the child get checked
     def validate_cpp_src_recursive(self):
-        return self._validate_cpp_src_recursive(res=[])
-
-    # helper function
-    def _validate_cpp_src_recursive(self, recurse=True, node=None, res=[]):
-        if not node:
-            node = self
+        if self.validation_errors == None:
+            # only the nodes without cached validation_errors get visited, their childs get validated first
+            for (node, _depth) in walk_postorder(self, get_real_childs_without_validation_errors):
+                node.validation_errors = node.__validate_cpp_src_subtree()
+        return list(self.validation_errors)
+
+    # helper function for validate_cpp_src_recursive(), returns the Errors of this subtree as tuple
+    # (the validation_errors of the childs have to be up to date)
+    def __validate_cpp_src_subtree(self):
         try:
-            wanted_childs = self.combinations[node.name].get(
+            wanted_childs = self.combinations[self.name].get(
                 "template_arguments", [])
             argument_count_max = len(wanted_childs)
-            argument_count_min = self.combinations[node.name].get(
+            argument_count_min = self.combinations[self.name].get(
                 "template_arguments_needed", argument_count_max)
         except:
-            # if the key node.name does not exist, we are at the bottom
-            return res
-        child_count = len(node.childs.get_real_childs())
+            # if the key self.name does not exist, we are at the bottom
+            return ()
+        res = []
+        real_childs = self.childs.get_real_childs()
+        child_count = len(real_childs)
         if child_count < argument_count_min:
-            res.append(Error(str(node.name) + ' needs at least ' + str(argument_count_min) +
+            res.append(Error(str(self.name) + ' needs at least ' + str(argument_count_min) +
                              ' template_arguments but only ' + str(child_count) + ' template_arguments given'))
         if child_count > argument_count_max:
-            res.append(Error(str(node.name) + ' only accepts ' + str(argument_count_max) +
+            res.append(Error(str(self.name) + ' only accepts ' + str(argument_count_max) +
                              ' template_arguments ' + str(child_count) + ' template_arguments given'))
-        for i in range(len(node.childs.get_real_childs())):
+        for i, child in enumerate(real_childs):
             try:
                 (_template_argument_description,
                  possible_template_arguments) = wanted_childs[i]
-                if possible_template_arguments == ["Integer"]:
+                if possible_template_arguments == ("Integer",):
                     try:
-                        int(node.childs.get_real_childs()[i].name)
+                        int(child.name)
                     except:
                         res.append(
-                            Error(str(node.childs.get_real_childs()[i].name) + ' is not an Integer'))
-                elif node.childs.get_real_childs()[i].name not in possible_template_arguments:
-                    res.append(Error(str(node.childs.get_real_childs()[
-                               i].name) + ' is not in the list of possible template_arguments for ' + node.name + '\n' + 'possible template_arguments are: ' + str(possible_template_arguments)))
+                            Error(str(child.name) + ' is not an Integer'))
+                elif not self.combinations.accepts(self.name, i, child.name):
+                    res.append(Error(str(child.name) + ' is not in the list of possible template_arguments for ' + self.name + '\n' + 'possible template_arguments are: ' + str(list(possible_template_arguments))))
             except:
                 pass
-            if recurse:
-                res = self._validate_cpp_src_recursive(
-                    node=node.childs.get_real_childs()[i], res=res)
-        return res
+            res.extend(child.validation_errors)
+        return tuple(res)
 
 class PlaceholderNode(Node):
+    __slots__ = ('needed',)
     def __init__(self, combinations, needed):
         self.needed = needed
         super().__init__(combinations)
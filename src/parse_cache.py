@@ -0,0 +1,59 @@
+import pickle
+import hashlib
+from collections import OrderedDict
+
+# a bounded LRU cache for parse results (e.g. the tree of a cpp-source or the PythonSettings of a python-source)
+# it is used when the same source gets parsed again (e.g. after undo, after opening the same file again or when applying the same text)
+# the results are stored pickled and get unpickled on every get(), so every caller gets its own copy and can change it
+# (unpickling is a lot faster than parsing the source again or a deepcopy)
+class ParseCache:
+    def __init__(self, max_entries=32, max_bytes=64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        # key -> pickled result, the least recently used entry is the first one
+        self.entries = OrderedDict()
+        self.bytes = 0
+        # counters for tuning max_entries and max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def __repr__(self):
+        return 'ParseCache(' + str(len(self.entries)) + ' entries, ' + str(self.bytes) + ' bytes, ' + str(self.hits) + ' hits, ' + str(self.misses) + ' misses)'
+
+    # returns the key of src, kind (e.g. 'cpp' or 'python') is part of the key, so different parsers don't share entries
+    def get_key(self, kind, src):
+        return hashlib.sha256((kind + '\0' + src).encode('utf-8', 'surrogatepass')).digest()
+
+    # returns a copy of the result stored for src or None
+    def get(self, kind, src):
+        key = self.get_key(kind, src)
+        data = self.entries.get(key)
+        if data == None:
+            self.misses = self.misses + 1
+            return None
+        self.hits = self.hits + 1
+        self.entries.move_to_end(key)
+        return pickle.loads(data)
+
+    # stores a copy of result for src
+    # results that can't be pickled (e.g. very deep trees) are not stored
+    def put(self, kind, src, result):
+        try:
+            data = pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            return
+        if len(data) > self.max_bytes:
+            return
+        key = self.get_key(kind, src)
+        if key in self.entries:
+            self.bytes = self.bytes - len(self.entries.pop(key))
+        self.entries[key] = data
+        self.bytes = self.bytes + len(data)
+        # remove the least recently used entries
+        while len(self.entries) > self.max_entries or self.bytes > self.max_bytes:
+            (_key, old_data) = self.entries.popitem(last=False)
+            self.bytes = self.bytes - len(old_data)
+
+    def clear(self):
+        self.entries.clear()
+        self.bytes = 0
@@ -10,6 +10,8 @@ from python_settings.settings_container import *
 from python_settings.settings_dict_entry import *
 from python_settings.settings_empty_line import *
 from python_settings.settings_list_entry import *
+from python_settings.settings_unparsed_container import *
+from python_settings.settings_numeric_list import *
 
 
 # this holds a complete settings.py by parsing its config-dict and storing the rest of the file in prefix and postfix
@@ -31,8 +33,20 @@ class PythonSettings():
             self.postfix = split2[1][1:]
 
             # iterate over tokens to create SettingsDict
-            self.config_dict = SettingsDict(settings)
+            self.config_dict = SettingsDict(settings, compact_numeric_lists=True)
             return None
 
     def __repr__(self):
-        return self.prefix + '\nconfig = ' + str(self.config_dict) + self.postfix
+        parts = []
+        self.write(parts.append)
+        return ''.join(parts)
+
+    # writes the settings.py to sink (a file, an io.StringIO or a function that takes a str) without creating the whole string
+    def write(self, sink):
+        write = getattr(sink, 'write', sink)
+        write(self.prefix + '\nconfig = ')
+        if self.config_dict == None:
+            write('None')
+        else:
+            write_repr(self.config_dict, write)
+        write(self.postfix)
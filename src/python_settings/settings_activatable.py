@@ -1,8 +1,15 @@
+from helpers import deepcopy_slots
+
+# activated and parent of all Activatables
+# the subclasses store them in __slots__ (to save memory in the copies of the UndoStack), so they have to call Activatable.__init__()
 class Activatable:
-    activated = True
-    parent = None
+    __slots__ = ()
     def __init__(self):
-        pass
+        self.activated = True
+        self.parent = None
+
+    def __deepcopy__(self, memo):
+        return deepcopy_slots(self, memo)
 
     def activate_recursive(self):
         self.activated = True
@@ -16,3 +16,7 @@ class SettingsConditional():
         else:
             value2 = self.else_block.repr(depth + 1, hide_placeholders=hide_placeholders)
         return value1 + ' if ' + self.condition + ' else ' + value2
+
+    # returns the parts of repr() for iter_repr() of settings_container, the blocks are expanded there
+    def repr_parts(self, depth, hide_placeholders=False):
+        return [(self.if_block, depth), ' if ' + self.condition + ' else ', (self.else_block, depth)]
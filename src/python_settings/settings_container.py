@@ -2,8 +2,8 @@ import re
 import typing
 import sys
 
-from tokenize import tokenize, untokenize, NUMBER, STRING, NAME, OP
-from helpers import Error
+from tokenize import tokenize, NUMBER, STRING, NAME, OP
+from helpers import Error, get_slot_names, deepcopy_slots
 import token
 from io import BytesIO
 
@@ -14,9 +14,12 @@ from python_settings.settings_activatable import *
 from python_settings.settings_empty_line import *
 from python_settings.settings_conditional import *
 from python_settings.settings_choice import *
+from python_settings.settings_unparsed_container import *
+from python_settings.settings_numeric_list import *
 
 # this class is the parent of SettingsDict and SettingsList
 class SettingsContainer(list):
+    __slots__ = ()
     # replaces the first found SettingsChildPlaceholder with the entries of child_dict
     def replaceChildPlaceholder(self, child_dict):
         for i in range(len(self)):
@@ -41,9 +44,19 @@ class SettingsContainer(list):
 
 # represents a python-settings-dict
 class SettingsDict(SettingsContainer, Activatable):
+    # key_index: (key -> first SettingsDictEntry with this key, tuple of the SettingsConditionals, SettingsDictEntry.key_changes)
+    # it is created by the first lookup (has_key(), get_value(), get_entry()) and kept up to date by the functions that change the list
+    # if it is not set or None or a key of any SettingsDictEntry changed since it was created, it has to be created again
+    # the if_blocks of the SettingsConditionals can be changed without this dict, so they are searched on every lookup
+    __slots__ = ('activated', 'parent', 'key_index')
+    # lists and dicts in the parsed settings with at least this many entries are kept as SettingsUnparsedContainers (None to parse everything)
+    unparsed_min_entries = 1000
     # init an empty SettingsDict or parse a settings-string to a SettingsDict
     # you can also give this a list with entries
-    def __init__(self, settings=None):
+    # if parse_first_container is True, the first list or dict in settings is parsed even if it is large (used by SettingsUnparsedContainer.parse())
+    # if compact_numeric_lists is True, the lists that only contain numbers are stored as SettingsNumericLists (used by PythonSettings)
+    def __init__(self, settings=None, parse_first_container=False, compact_numeric_lists=False):
+        Activatable.__init__(self)
         if settings == None:
             return
         elif isinstance(settings, typing.List):
@@ -53,9 +66,13 @@ class SettingsDict(SettingsContainer, Activatable):
 
         # remove outer braces
         settings = settings[1:][:-1]
+        # replace large lists and dicts with names, they become SettingsUnparsedContainers when they are the value of an entry
+        (settings, unparsed_containers) = extract_unparsed_containers(settings, self.unparsed_min_entries, parse_first_container)
 
         # split settings into tokens using tokenize from the stdlib
         tokens = tokenize(BytesIO(settings.encode('utf-8')).readline)
+        # the values are sliced from settings, line_starts are the offsets of the rows of the tokens
+        line_starts = get_line_starts(settings)
 
         stack = []
         stack.append(self)
@@ -83,14 +100,13 @@ class SettingsDict(SettingsContainer, Activatable):
                     append_comment = True
                     if isinstance(stack[-1], SettingsDict):
                         if len(token_buffer) > 0:
-                            stack[-1][-1].value = tokens_to_string(
-                                token_buffer)
+                            stack[-1][-1].value = get_tokens_source(settings, line_starts, token_buffer, unparsed_containers)
                             token_buffer = []
                         mode_stack.pop()
                     else:
                         if len(token_buffer) > 0:
                             list_entry = SettingsListEntry()
-                            list_entry.value = tokens_to_string(token_buffer)
+                            list_entry.value = get_tokens_source(settings, line_starts, token_buffer, unparsed_containers)
                             stack[-1].append(list_entry)
                             token_buffer = []
                 # don't append comments to SettingsDictEntry or SettingsListEntry after newline
@@ -138,7 +154,7 @@ class SettingsDict(SettingsContainer, Activatable):
                     nested_counter = nested_counter - 1
                 elif nested_counter == 0:
                     if len(token_buffer) > 0:
-                        stack[-1][-1].value = tokens_to_string(token_buffer)
+                        stack[-1][-1].value = get_tokens_source(settings, line_starts, token_buffer, unparsed_containers)
                         token_buffer = []
                     # pop 2 times because of key+value on mode_stack
                     mode_stack.pop()
@@ -167,8 +183,7 @@ class SettingsDict(SettingsContainer, Activatable):
                 if mode_stack[-1] == "list_comprehension":
                     if nested_counter == 1:
                         #if token_buffer:
-                        stack[-1].list_comprehension = tokens_to_string(
-                        token_buffer)
+                        stack[-1].list_comprehension = get_tokens_source(settings, line_starts, token_buffer, unparsed_containers)
                         token_buffer = []
                         nested_counter = 0
                         stack.pop()
@@ -182,12 +197,16 @@ class SettingsDict(SettingsContainer, Activatable):
                     if len(token_buffer) > 0:
                         if isinstance(stack[-1], SettingsList):
                             list_entry = SettingsListEntry()
-                            list_entry.value = tokens_to_string(token_buffer)
+                            list_entry.value = get_tokens_source(settings, line_starts, token_buffer, unparsed_containers)
                             stack[-1].append(list_entry)
                         token_buffer = []
                     mode_stack.pop()
-                    stack.pop()
+                    list = stack.pop()
                     append_comment = True
+                    if compact_numeric_lists and (isinstance(stack[-1], SettingsDict) or isinstance(stack[-1], SettingsList)) and stack[-1][-1].value is list:
+                        numeric_list = get_numeric_list(list)
+                        if numeric_list != None:
+                            stack[-1][-1].value = numeric_list
                     if isinstance(stack[-1], SettingsConditional):
                         # also pop the SettingsConditional, we are done with that
                         stack.pop()
@@ -209,14 +228,13 @@ class SettingsDict(SettingsContainer, Activatable):
                     append_comment = True
                     if isinstance(stack[-1], SettingsDict):
                         if len(token_buffer) > 0:
-                            stack[-1][-1].value = tokens_to_string(
-                                token_buffer)
+                            stack[-1][-1].value = get_tokens_source(settings, line_starts, token_buffer, unparsed_containers)
                             token_buffer = []
                         mode_stack.pop()
                     else:
                         if len(token_buffer) > 0:
                             list_entry = SettingsListEntry()
-                            list_entry.value = tokens_to_string(token_buffer)
+                            list_entry.value = get_tokens_source(settings, line_starts, token_buffer, unparsed_containers)
                             stack[-1].append(list_entry)
                             token_buffer = []
                 elif nested_counter == 0 and token_type == 'NAME' and token_value == 'if':
@@ -231,7 +249,7 @@ class SettingsDict(SettingsContainer, Activatable):
                 elif mode_stack[-1] == 'conditional' and nested_counter == 1 and token_type == 'NAME' and token_value == 'else':
                     nested_counter = 0
                     mode_stack.pop()
-                    stack[-1].condition = tokens_to_string(token_buffer)
+                    stack[-1].condition = get_tokens_source(settings, line_starts, token_buffer, unparsed_containers)
                     token_buffer = []
                 else:
                     # handle list-comprehensions like [ ... for i in range 10]
@@ -255,10 +273,18 @@ class SettingsDict(SettingsContainer, Activatable):
         return self.repr(0)
 
     def repr(self, depth, hide_placeholders=False):
+        return ''.join(iter_repr(self, depth, hide_placeholders))
+
+    # writes repr() to sink (a file, an io.StringIO or a function that takes a str) without creating the whole string
+    def write(self, sink, depth=0, hide_placeholders=False):
+        write_repr(self, sink, depth, hide_placeholders)
+
+    # returns the parts of repr(): strings and (value, depth) for the values of the entries (see iter_repr())
+    def repr_parts(self, depth, hide_placeholders=False):
         if len(self) == 0:
-            return '{}'
+            return ['{}']
         indentation = '  '
-        r = ''
+        parts = ['{']
         for i in range(len(self)):
             entrie = self[i]
             # don't print inserted defaults entries, that are not activated
@@ -270,78 +296,152 @@ class SettingsDict(SettingsContainer, Activatable):
                 comments = ''
                 for comment in entrie.comments:
                     comments = comments + ' ' + comment
-                if isinstance(entrie.value, str):
-                    value = entrie.value
-                else:
-                    #print(entrie.key)
-                    #print(entrie.comments)
-                    #print(entrie.value)
-                    value = entrie.value.repr(depth + 1, hide_placeholders=hide_placeholders)
                 optional_comma = ','
                 if i == len(self) - 1:
                     optional_comma = ''
-                entrie_r = indentation * \
-                    (depth + 1) + entrie.key + ' : ' + \
-                    value + optional_comma + comments
+                parts.append('\n' + indentation * (depth + 1) + entrie.key + ' : ')
+                parts.append((entrie.value, depth + 1))
+                parts.append(optional_comma + comments)
             elif hide_placeholders and isinstance(entrie, SettingsChildPlaceholder):
                 continue
             elif isinstance(entrie, SettingsChoice) or isinstance(entrie, SettingsMesh) or isinstance(entrie, SettingsSolver):
                 # repr everything in SettingsChoice SettingsMesh and SettingsSolver (only for testing, this should not happen normally)
-                entrie_r = ''
                 if isinstance(entrie, SettingsChoice):
                     es = entrie.defaults + entrie.alternatives
                 else:
-                    es = entrie
-                    # resolve choices in meshes and solvers:
+                    # resolve choices in meshes and solvers (in a copy, entrie could be in the read-only defaults of the catalog)
+                    es = list(entrie)
                     for e in es:
                         if isinstance(e, SettingsChoice):
                             es.extend(e.defaults + e.alternatives)
                             es.remove(e)
-                for e in es:
-                    if isinstance(e.value, str):
-                        value = e.value
-                    else:
-                        value = e.value.repr(depth + 1, hide_placeholders=hide_placeholders)
-                    entrie_r = entrie_r + indentation * (depth + 1) + e.key + ' : ' + value + ',\n'
-                entrie_r = entrie_r[:-1]
+                parts.append('\n')
+                for j, e in enumerate(es):
+                    if j > 0:
+                        parts.append(',\n')
+                    parts.append(indentation * (depth + 1) + e.key + ' : ')
+                    parts.append((e.value, depth + 1))
+                if len(es) > 0:
+                    parts.append(',')
             elif isinstance(entrie, SettingsComment):
                 # SettingsChildPlaceholder gets handled here if hide_placeholders==False
-                entrie_r = indentation * (depth + 1) + entrie.comment
+                parts.append('\n' + indentation * (depth + 1) + entrie.comment)
             elif isinstance(entrie, SettingsEmptyLine):
-                entrie_r = ''
-            r = r + '\n' + entrie_r
-        return '{' + r + '\n' + indentation * depth + '}'
+                parts.append('\n')
+        parts.append('\n' + indentation * depth + '}')
+        return parts
+
+    # the key_index is not copied, the copy creates its own one
+    def __deepcopy__(self, memo):
+        return deepcopy_slots(self, memo, skip=('key_index',))
+
+    # the key_index is not pickled (e.g. in the catalog cache)
+    def __getstate__(self):
+        state = {}
+        for name in get_slot_names(type(self)):
+            if name != 'key_index' and hasattr(self, name):
+                state[name] = getattr(self, name)
+        return (None, state)
+
+    # appending a SettingsDictEntry with a key only adds it to the key_index (an entry with the same key before it wins)
+    # everything else that can change the keys invalidates the key_index
+    def append(self, entry):
+        super().append(entry)
+        key_index = getattr(self, 'key_index', None)
+        if key_index != None:
+            if isinstance(entry, SettingsDictEntry) and entry.key != None:
+                key_index[0].setdefault(entry.key, entry)
+            elif isinstance(entry, SettingsDictEntry) or isinstance(entry, SettingsConditional):
+                # the key of an entry without key gets set later (e.g. while parsing)
+                self.key_index = None
+
+    def insert(self, i, entry):
+        super().insert(i, entry)
+        self.key_index = None
+
+    def extend(self, entries):
+        super().extend(entries)
+        self.key_index = None
+
+    def __iadd__(self, entries):
+        self.extend(entries)
+        return self
+
+    def pop(self, *args):
+        self.key_index = None
+        return super().pop(*args)
+
+    def remove(self, entry):
+        super().remove(entry)
+        self.key_index = None
+
+    def clear(self):
+        super().clear()
+        self.key_index = None
+
+    def __setitem__(self, i, entry):
+        super().__setitem__(i, entry)
+        self.key_index = None
+
+    def __delitem__(self, i):
+        super().__delitem__(i)
+        self.key_index = None
+
+    def sort(self, *args, **kwargs):
+        super().sort(*args, **kwargs)
+        self.key_index = None
+
+    def reverse(self):
+        super().reverse()
+        self.key_index = None
+
+    # returns the key_index
+    def get_key_index(self):
+        key_index = getattr(self, 'key_index', None)
+        if key_index == None or key_index[2] != SettingsDictEntry.key_changes:
+            own_entries = {}
+            conditionals = []
+            has_keyless_entries = False
+            for entry in self:
+                if isinstance(entry, SettingsDictEntry):
+                    if entry.key == None:
+                        has_keyless_entries = True
+                    own_entries.setdefault(entry.key, entry)
+                elif isinstance(entry, SettingsConditional):
+                    conditionals.append(entry)
+            key_index = (own_entries, tuple(conditionals), SettingsDictEntry.key_changes)
+            # the key of a keyless entry can be set without counting it as change, so the key_index is only kept without them
+            if not has_keyless_entries:
+                self.key_index = key_index
+        return key_index
 
     def has_key(self, key):
-        conditionals_resolved = self.__get_resolved_Conditionals()
-        return any(isinstance(entry, SettingsDictEntry) and key == entry.key for entry in self + conditionals_resolved)
+        return self.get_entry(key) != None
 
     def get_value(self, key):
-        conditionals_resolved = self.__get_resolved_Conditionals()
-        for entry in self + conditionals_resolved:
-            if isinstance(entry, SettingsDictEntry) and entry.key == key:
-                return entry.value
+        entry = self.get_entry(key)
+        if entry != None:
+            return entry.value
         return
 
+    # the own entries come before the entries of the if_blocks of the SettingsConditionals
     def get_entry(self, key):
-        conditionals_resolved = self.__get_resolved_Conditionals()
-        for entry in self + conditionals_resolved:
-            if isinstance(entry, SettingsDictEntry) and entry.key == key:
-                return entry
+        (own_entries, conditionals, _key_changes) = self.get_key_index()
+        entry = own_entries.get(key)
+        if entry != None:
+            return entry
+        for conditional in conditionals:
+            # this only resolves stuff in if_block not in else_block
+            for e in conditional.if_block:
+                if isinstance(e, SettingsDictEntry) and e.key == key:
+                    return e
         return
 
-    def __get_resolved_Conditionals(self):
-        conditionals_resolved = []
-        for entry in self:
-            if isinstance(entry, SettingsConditional):
-                # this only resolves stuff in if_block not in else_block
-                for e in entry.if_block:
-                    conditionals_resolved.append(e)
-        return conditionals_resolved
-
 # represents a list stored in a SettingsDictEntry.value or a SettingsListEntry.value
 class SettingsList(SettingsContainer, Activatable):
+    __slots__ = ('activated', 'parent', 'list_comprehension')
     def __init__(self, entries=None):
+        Activatable.__init__(self)
         self.list_comprehension = None
         if entries:
             if isinstance(entries, str):
@@ -361,35 +461,39 @@ class SettingsList(SettingsContainer, Activatable):
         return self.repr(0)
 
     def repr(self, depth, hide_placeholders=False):
+        return ''.join(iter_repr(self, depth, hide_placeholders))
+
+    # writes repr() to sink (a file, an io.StringIO or a function that takes a str) without creating the whole string
+    def write(self, sink, depth=0, hide_placeholders=False):
+        write_repr(self, sink, depth, hide_placeholders)
+
+    # returns the parts of repr(): strings and (value, depth) for the values of the entries (see iter_repr())
+    def repr_parts(self, depth, hide_placeholders=False):
         if len(self) == 0:
-            return '[]'
+            return ['[]']
         indentation = '  '
-        r = ''
+        parts = ['[']
         for i in range(len(self)):
             entrie = self[i]
             if isinstance(entrie, SettingsListEntry):
                 comments = ''
                 for comment in entrie.comments:
                     comments = comments + ' ' + comment
-                if isinstance(entrie.value, str):
-                    value = entrie.value
-                else:
-                    value = entrie.value.repr(depth + 1, hide_placeholders=hide_placeholders)
                 optional_comma = ','
                 comprehension = ''
                 if i == len(self) - 1:
                     optional_comma = ''
                     if self.list_comprehension:
                         comprehension = ' ' + self.list_comprehension
-                entrie_r = indentation * \
-                    (depth + 1) + value + comprehension + \
-                    optional_comma + comments
+                parts.append('\n' + indentation * (depth + 1))
+                parts.append((entrie.value, depth + 1))
+                parts.append(comprehension + optional_comma + comments)
             elif isinstance(entrie, SettingsComment):
-                entrie_r = indentation * (depth + 1) + entrie.comment
+                parts.append('\n' + indentation * (depth + 1) + entrie.comment)
             elif isinstance(entrie, SettingsEmptyLine):
-                entrie_r = ''
-            r = r + '\n' + entrie_r
-        return '[' + r + '\n' + indentation * depth + ']'
+                parts.append('\n')
+        parts.append('\n' + indentation * depth + ']')
+        return parts
 
     def get_first_SettingsListEntry(self):
         for entry in self:
@@ -409,7 +513,9 @@ class SettingsList(SettingsContainer, Activatable):
 
 
 class SettingsMesh(SettingsDict):
+    __slots__ = ('name_key', 'name_prefix', 'global_key')
     def __init__(self, options):
+        Activatable.__init__(self)
         for entry in options:
             self.append(entry)
         self.name_key = '"meshName"'
@@ -417,14 +523,160 @@ class SettingsMesh(SettingsDict):
         self.global_key = '"Meshes"'
 
 class SettingsSolver(SettingsDict):
+    __slots__ = ('name_key', 'name_prefix', 'global_key')
     def __init__(self, options):
+        Activatable.__init__(self)
         for entry in options:
             self.append(entry)
         self.name_key = '"solverName"'
         self.name_prefix = 'solver'
         self.global_key = '"Solvers"'
 
-# helper function wrapping pythons untokenize-function to improve readability of the returned string
-def tokens_to_string(tokens):
-    #print(tokens)
-    return untokenize(tokens).splitlines()[-1].strip()
+# yields the parts of the python-source of value (a str or an object with repr_parts(), e.g. a SettingsDict) at depth
+# the nested values get expanded with an explicit stack instead of recursion, so deeply nested settings don't hit the recursion limit
+def iter_repr(value, depth, hide_placeholders=False):
+    stack = [(value, depth)]
+    while stack:
+        part = stack.pop()
+        if isinstance(part, str):
+            yield part
+            continue
+        (value, depth) = part
+        if isinstance(value, str):
+            yield value
+            continue
+        parts = value.repr_parts(depth, hide_placeholders)
+        for i in range(len(parts) - 1, -1, -1):
+            stack.append(parts[i])
+
+
+# writes the parts of iter_repr() to sink, a file-like object with write() (e.g. a file or an io.StringIO) or a function that takes a str
+# the parts are joined to chunks of about chunk_size chars, so sink (e.g. a Gtk.TextBuffer) isn't called for every small part
+def write_repr(value, sink, depth=0, hide_placeholders=False, chunk_size=65536):
+    write = getattr(sink, 'write', sink)
+    chunk = []
+    size = 0
+    for part in iter_repr(value, depth, hide_placeholders):
+        chunk.append(part)
+        size = size + len(part)
+        if size >= chunk_size:
+            write(''.join(chunk))
+            chunk = []
+            size = 0
+    if chunk:
+        write(''.join(chunk))
+
+
+# returns the offsets of the lines of src (the lines that tokenize reads with readline())
+def get_line_starts(src):
+    line_starts = [0]
+    i = src.find('\n')
+    while i != -1:
+        line_starts.append(i + 1)
+        i = src.find('\n', i + 1)
+    return line_starts
+
+# the names that extract_unparsed_containers() gives the SettingsUnparsedContainers
+unparsed_container_name = re.compile(r'__unparsed_container_[0-9]+__')
+
+# returns the source of tokens (tokenized from src, e.g. a value) without the whitespace around it
+# it is sliced from src between the start of the first and the end of the last token, so the tokens don't have to be untokenized
+# only the last line of values that span multiple lines is kept
+# if the source is the name of a SettingsUnparsedContainer in unparsed_containers, the SettingsUnparsedContainer is returned
+# the names in other values (e.g. lambda x: [..]) are replaced with the sources of their SettingsUnparsedContainers again
+def get_tokens_source(src, line_starts, tokens, unparsed_containers={}):
+    (start_row, start_col) = tokens[0].start
+    (end_row, end_col) = tokens[-1].end
+    value = src[line_starts[start_row - 1] + start_col:line_starts[end_row - 1] + end_col]
+    if start_row != end_row:
+        value = value.splitlines()[-1]
+    value = value.strip()
+    if not unparsed_containers:
+        return value
+    if value in unparsed_containers:
+        return unparsed_containers[value]
+    return unparsed_container_name.sub(lambda match: unparsed_containers[match.group()].src, value)
+
+# matches the parts of a settings-source that extract_unparsed_containers() has to look at, everything else is skipped
+unparsed_containers_scan = re.compile(r'''(?P<string>"""(?:[^\\]|\\.)*?"""|\'\'\'(?:[^\\]|\\.)*?\'\'\'|"(?:[^"\\\n]|\\.)*"|'(?:[^'\\\n]|\\.)*')|(?P<comment>\#[^\n]*)|(?P<open>[\[{(])|(?P<close>[\]})])|(?P<comma>,)''', re.DOTALL)
+
+# returns (src with every large list and dict replaced by a name, {name: SettingsUnparsedContainer})
+# a list or dict is replaced if it has at least min_entries entries and if it is a whole value
+# (e.g. not [1, 2] in [1, 2] + x, foo([1, 2]) or x[1]), large lists and dicts in it are part of it
+# the entries are counted by the commas, so this does not need to tokenize them
+# if keep_first is True, the first list or dict is not replaced (but the large ones in it are)
+def extract_unparsed_containers(src, min_entries, keep_first=False):
+    unparsed_containers = {}
+    if min_entries == None:
+        return (src, unparsed_containers)
+    # [start, number of commas, can be replaced] of the open brackets
+    stack = []
+    parentheses = 0
+    # the start of the first list or dict
+    first_start = None
+    # (start, end, entries) of the containers that get replaced, without the ones in other replaced containers
+    spans = []
+    for match in unparsed_containers_scan.finditer(src):
+        kind = match.lastgroup
+        if kind == 'comma':
+            if stack:
+                stack[-1][1] = stack[-1][1] + 1
+        elif kind == 'open':
+            start = match.start()
+            bracket = match.group()
+            if bracket == '(':
+                parentheses = parentheses + 1
+                stack.append([start, 0, False])
+            else:
+                if first_start == None and not stack:
+                    first_start = start
+                # the container has to be a value in a dict or a list
+                stack.append([start, 0, parentheses == 0 and get_previous_char(src, start) in ('', ':', ',', '[', '{')])
+        elif kind == 'close':
+            if not stack:
+                continue
+            if match.group() == ')':
+                parentheses = parentheses - 1
+            (start, commas, can_be_replaced) = stack.pop()
+            end = match.end()
+            if keep_first and start == first_start:
+                continue
+            if can_be_replaced and commas + 1 >= min_entries and get_next_char(src, end) in ('', ',', '}', ']', '#', '\n', '\r'):
+                entries = commas
+                # a trailing comma has no entry after it
+                if get_previous_char(src, end - 1) != ',':
+                    entries = entries + 1
+                if entries >= min_entries:
+                    # the large containers in this one are part of it
+                    while spans and spans[-1][0] > start:
+                        spans.pop()
+                    spans.append((start, end, entries))
+    if not spans:
+        return (src, unparsed_containers)
+    parts = []
+    position = 0
+    for i, (start, end, entries) in enumerate(spans):
+        name = '__unparsed_container_' + str(i) + '__'
+        unparsed_containers[name] = SettingsUnparsedContainer(src[start:end], entries)
+        parts.append(src[position:start])
+        parts.append(name)
+        position = end
+    parts.append(src[position:])
+    return (''.join(parts), unparsed_containers)
+
+# returns the last char before position that is no whitespace ('' if there is none)
+def get_previous_char(src, position):
+    position = position - 1
+    while position >= 0 and src[position] in ' \t\r\n':
+        position = position - 1
+    if position < 0:
+        return ''
+    return src[position]
+
+# returns the first char at or after position that is no space or tab ('' if there is none)
+def get_next_char(src, position):
+    while position < len(src) and src[position] in ' \t':
+        position = position + 1
+    if position >= len(src):
+        return ''
+    return src[position]
@@ -2,17 +2,34 @@ from python_settings.settings_activatable import Activatable
 
 # normal entry in a SettingsDict
 class SettingsDictEntry(Activatable):
+    __slots__ = ('activated', 'parent', '_key', 'value', 'comments', 'doc_link', 'is_unknown', 'default_comment')
+    # counts the changes of the keys of all SettingsDictEntrys, a SettingsDict.key_index that was created before a change is not used again
+    # (an entry can be in more than one SettingsDict, e.g. the resolved defaults in node.py, so the dicts can't be notified directly)
+    key_changes = 0
+
     def __init__(self, key=None, value=None, comment=None, doc_link=None):
+        Activatable.__init__(self)
+        # a new entry is in no SettingsDict yet, so this is no change
         if isinstance(key, str) and not key[0] == '"':
-            self.key = '"' + key + '"'
+            self._key = '"' + key + '"'
         else:
-            self.key = key
+            self._key = key
         self.value = value
         self.comments = []
         if comment:
             self.comments.append('# ' + comment)
         self.doc_link = None
         self.is_unknown = False
-        self.parent = None
         if doc_link:
             self.doc_link = doc_link
+
+    @property
+    def key(self):
+        return self._key
+
+    # setting the key of an entry without a key (e.g. by the parser) is no change, SettingsDicts with such entries don't keep their key_index
+    @key.setter
+    def key(self, key):
+        if self._key != None and key != self._key:
+            SettingsDictEntry.key_changes = SettingsDictEntry.key_changes + 1
+        self._key = key
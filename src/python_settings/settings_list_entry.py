@@ -2,7 +2,9 @@ from python_settings.settings_activatable import Activatable
 
 # normal entry for a SettingsList
 class SettingsListEntry(Activatable):
+    __slots__ = ('activated', 'parent', 'value', 'comments')
     def __init__(self, value=None, comment=None):
+        Activatable.__init__(self)
         self.value = value
         self.comments = []
         if comment:
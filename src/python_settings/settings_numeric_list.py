@@ -0,0 +1,111 @@
+import re
+from array import array
+
+from python_settings.settings_list_entry import SettingsListEntry
+
+# a list of numbers in a SettingsDictEntry.value or a SettingsListEntry.value (e.g. initialValues or nodePositions)
+# the parser of PythonSettings creates these for lists that only contain numbers (without comments), instead of a SettingsList
+# with a SettingsListEntry and a str for every number, the numbers are stored in an array with 8 bytes per number
+# format is the formatting descriptor, it gives back the source of the numbers:
+#   'int'       the numbers are ints
+#   'repr'      the numbers are floats that are written like repr() writes them (e.g. 0.5, 1e-05)
+#   '.Nf'       the numbers are floats that are written with N decimals (e.g. 0.50)
+# it can't be changed, use parse() to get a SettingsList (e.g. when it gets expanded in the gui)
+class SettingsNumericList:
+    __slots__ = ('values', 'format')
+    def __init__(self, values=None, format='int'):
+        if values == None:
+            values = array('q')
+        self.values = values
+        self.format = format
+
+    # it can't be changed, so copies (e.g. the deepcopys of the UndoStack) can share it
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __len__(self):
+        return len(self.values)
+
+    # returns the source of the i'th number (like the value of a SettingsListEntry)
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return self.get_sources(self.values[i])
+        return self.get_sources((self.values[i],))[0]
+
+    def __iter__(self):
+        return iter(self.get_sources(self.values))
+
+    # returns the sources of values (numbers stored with self.format)
+    def get_sources(self, values):
+        if self.format == 'int':
+            return list(map(str, values))
+        if self.format == 'repr':
+            return list(map(repr, values))
+        return list(map(('{:' + self.format + '}').format, values))
+
+    # returns a short description for the gui, e.g. '[0.0, 1.0, 2.0, .. 5000 entries ..]'
+    def get_summary(self, max_entries=8):
+        if len(self.values) <= max_entries:
+            return '[' + ', '.join(self.get_sources(self.values)) + ']'
+        return '[' + ', '.join(self.get_sources(self.values[:3])) + ', .. ' + str(len(self.values)) + ' entries ..]'
+
+    # returns a SettingsList with a SettingsListEntry for every number
+    def parse(self):
+        # only imported here, because settings_container needs this module
+        from python_settings.settings_container import SettingsList
+        return SettingsList(self.get_sources(self.values))
+
+    # formats all numbers at once, like SettingsList.repr() formats a list of SettingsListEntrys
+    def repr(self, depth, hide_placeholders=False):
+        if len(self.values) == 0:
+            return '[]'
+        indentation = '  '
+        return '[\n' + indentation * (depth + 1) + (',\n' + indentation * (depth + 1)).join(self.get_sources(self.values)) + '\n' + indentation * depth + ']'
+
+    def repr_parts(self, depth, hide_placeholders=False):
+        return [self.repr(depth, hide_placeholders)]
+
+    def __repr__(self):
+        return self.repr(0)
+
+
+# the numbers that can be stored, other literals (e.g. 1_000, 0x10 or inf) stay in a SettingsList
+numeric_list_int = re.compile(r'-?[0-9]+\Z')
+numeric_list_float = re.compile(r'-?(?:[0-9]+\.?[0-9]*|\.[0-9]+)(?:[eE][-+]?[0-9]+)?\Z')
+numeric_list_fixed = re.compile(r'-?[0-9]+\.([0-9]+)\Z')
+
+# returns a SettingsNumericList with the values of settings_list or None if they can't be stored in one
+# (e.g. if settings_list contains other values, comments or a list_comprehension or if a number would not be written the same way again)
+def get_numeric_list(settings_list):
+    if len(settings_list) == 0 or settings_list.list_comprehension:
+        return None
+    sources = []
+    for entry in settings_list:
+        if not isinstance(entry, SettingsListEntry) or entry.comments or not isinstance(entry.value, str):
+            return None
+        sources.append(entry.value)
+
+    if all(numeric_list_int.match(source) for source in sources):
+        try:
+            values = array('q', map(int, sources))
+        except OverflowError:
+            return None
+        if list(map(str, values)) != sources:
+            return None
+        return SettingsNumericList(values, 'int')
+
+    if not all(numeric_list_float.match(source) for source in sources):
+        return None
+    values = array('d', map(float, sources))
+    if list(map(repr, values)) == sources:
+        return SettingsNumericList(values, 'repr')
+    # all numbers with the same number of decimals (e.g. 0.50, 1.25)
+    match = numeric_list_fixed.match(sources[0])
+    if match:
+        format = '.' + str(len(match.group(1))) + 'f'
+        if list(map(('{:' + format + '}').format, values)) == sources:
+            return SettingsNumericList(values, format)
+    return None
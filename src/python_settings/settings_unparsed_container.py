@@ -0,0 +1,40 @@
+# a large list or dict in a SettingsDictEntry.value or a SettingsListEntry.value, that is kept as its source (e.g. node positions)
+# the parser creates these for lists and dicts with at least SettingsDict.unparsed_min_entries entries, because
+# parsing them into thousands of SettingsListEntrys is slow, needs a lot of memory and the gui would show a row for each of them
+# it can't be changed, use parse() to get the SettingsList or SettingsDict and replace the value with it (e.g. when it gets expanded in the gui)
+class SettingsUnparsedContainer:
+    __slots__ = ('src', 'entries')
+    def __init__(self, src, entries):
+        self.src = src
+        self.entries = entries
+
+    # it can't be changed, so copies (e.g. the deepcopys of the UndoStack) can share it
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    # returns a short description for the gui, e.g. '[.. 5000 entries ..]'
+    def get_summary(self):
+        return self.src[0] + '.. ' + str(self.entries) + ' entries ..' + self.src[-1]
+
+    # returns the parsed SettingsList or SettingsDict like PythonSettings parses it,
+    # its large lists and dicts are SettingsUnparsedContainers again and its lists of numbers are SettingsNumericLists
+    def parse(self):
+        # only imported here, because settings_container needs this module
+        from python_settings.settings_container import SettingsDict
+        if self.src.startswith('{'):
+            return SettingsDict(self.src, compact_numeric_lists=True)
+        # the parser only parses dicts, so a list is parsed as the value of a dict
+        return SettingsDict('{\n"list": ' + self.src + '\n}', parse_first_container=True, compact_numeric_lists=True)[0].value
+
+    # the source is kept as it is, so it is not indented again
+    def repr(self, depth, hide_placeholders=False):
+        return self.src
+
+    def repr_parts(self, depth, hide_placeholders=False):
+        return [self.src]
+
+    def __repr__(self):
+        return self.src
@@ -6,6 +6,7 @@ from python_settings.python_settings import *
 
 
 class RootNode(Node):
+    __slots__ = ('cpp_src',)
     def __init__(self, combinations):
         super().__init__(combinations)
 
@@ -14,6 +15,9 @@ class RootNode(Node):
         self.settings_dict_prefix = ''
         self.settings_dict_postfix = ''
 
+        # the cpp-source the positions of the nodes belong to (see CPPTree.__repr__())
+        self.cpp_src = None
+
         self.insert_missing_default_python_settings_deactivated(self.settings_dict)
         self.activate_all_default_python_settings(self.settings_dict)
 
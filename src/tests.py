@@ -1,10 +1,21 @@
 #!/usr/bin/python3
 
+import io
+import os
+import pickle
+import shutil
+import sys
+import tempfile
 import unittest
 
 from cpp_tree import CPPTree
+from node import Node
+import copy
+from catalog import get_catalog, load_catalog_data, build_catalog_data, read_catalog_cache, write_catalog_cache, read_frequency_index, Catalog, CatalogIndex
 from python_settings.python_settings import *
-from helpers import Error
+from helpers import Error, Info
+from batch import find_cpp_files, parse_and_validate_files
+from frequency_index import build_frequency_index, write_frequency_index
 
 
 class TestParser(unittest.TestCase):
@@ -70,9 +81,8 @@ class TestParser(unittest.TestCase):
         "electrophysiology/multidomain/multidomain_no_fat/src/multidomain_output.cpp",
         "electrophysiology/multidomain/multidomain_with_fat/src/multidomain_shorten_with_fat.cpp",
         "electrophysiology/multidomain/multidomain_with_fat/src/multidomain_with_fat.cpp",
-        # IGNORE TODO using instead of define
-        # "electrophysiology/neuromuscular/neurons_with_contraction/src/neurons_with_contraction.cpp",
-        # "electrophysiology/neuromuscular/only_neurons/src/only_neurons.cpp",
+        "electrophysiology/neuromuscular/neurons_with_contraction/src/neurons_with_contraction.cpp",
+        "electrophysiology/neuromuscular/only_neurons/src/only_neurons.cpp",
         # TODO problem.fixInvalidFibersInFile();
         "fiber_tracing/parallel_fiber_estimation/src/fix.cpp",
         "fiber_tracing/parallel_fiber_estimation/src/generate.cpp",
@@ -173,6 +183,323 @@ class TestParser(unittest.TestCase):
             self.assertEqual(example1.undo_stack.get_current_root().childs.get_real_childs()[0].compare_cpp(
                 example2.undo_stack.get_current_root().childs.get_real_childs()[0]), True, msg=path)
 
+    # typedefs and comments in a small example
+    def test_parse_typedefs_and_comments(self):
+        src = """int main(int argc, char *argv[])
+{
+  // typedefs
+  typedef Mesh::StructuredDeformableOfDimension<3> MeshType;
+  DihuContext settings(argc, argv);
+  LOG(DEBUG) << "start";
+  // the problem
+  SpatialDiscretization::FiniteElementMethod<   // fem
+    MeshType,  // the mesh
+    BasisFunction::LagrangeOfOrder<1>,
+    Quadrature::Gauss<2>,
+    Equation::Static::Laplace
+  > problem(settings);
+}
+"""
+        example = CPPTree()
+        example.load_empty_simulation()
+        example.parse_cpp_src(src)
+        top = example.undo_stack.get_current_root().childs.get_real_childs()[0]
+        self.assertEqual(top.name, "SpatialDiscretization::FiniteElementMethod")
+        self.assertEqual(top.comment, " the problem")
+        childs = top.childs.get_real_childs()
+        self.assertEqual([child.name for child in childs], ["Mesh::StructuredDeformableOfDimension", "BasisFunction::LagrangeOfOrder", "Quadrature::Gauss", "Equation::Static::Laplace"])
+        self.assertEqual(childs[0].comment, " fem the mesh")
+        self.assertEqual(childs[0].childs.get_real_childs()[0].name, "3")
+        self.assertEqual(example.undo_stack.get_current_root().validate_cpp_src_recursive(), [])
+
+    # using-aliases that use other aliases
+    def test_parse_using(self):
+        src = """int main(int argc, char *argv[])
+{
+  using namespace std;
+  typedef Mesh::StructuredDeformableOfDimension<3> MeshType;
+  using FiniteElementMethod = SpatialDiscretization::FiniteElementMethod<
+    MeshType, BasisFunction::LagrangeOfOrder<1>, Quadrature::Gauss<2>, Equation::Dynamic::IsotropicDiffusion
+  >;
+  using Problem = Control::MultipleInstances<TimeSteppingScheme::ImplicitEuler<FiniteElementMethod>>;
+  DihuContext settings(argc, argv);
+  Problem problem(settings);
+}
+"""
+        example = CPPTree()
+        example.load_empty_simulation()
+        example.parse_cpp_src(src)
+        node = example.undo_stack.get_current_root().childs.get_real_childs()[0]
+        names = []
+        while node != None:
+            names.append(node.name)
+            childs = node.childs.get_real_childs()
+            node = childs[0] if childs else None
+        self.assertEqual(names, ["Control::MultipleInstances", "TimeSteppingScheme::ImplicitEuler", "SpatialDiscretization::FiniteElementMethod", "Mesh::StructuredDeformableOfDimension", "3"])
+        self.assertEqual(example.undo_stack.get_current_root().validate_cpp_src_recursive(), [])
+
+    # only the changed node gets parsed again, all other nodes stay the same objects (with their python-settings)
+    def test_parse_incremental(self):
+        src = """int main(int argc, char *argv[])
+{
+  DihuContext settings(argc, argv);
+  SpatialDiscretization::FiniteElementMethod<
+    Mesh::StructuredRegularFixedOfDimension<1>,
+    BasisFunction::LagrangeOfOrder<1>,
+    Quadrature::Gauss<2>,
+    Equation::Static::Laplace
+  > problem(settings);
+}
+"""
+        example = CPPTree()
+        example.load_empty_simulation()
+        example.parse_cpp_src(src)
+        root = example.undo_stack.get_current_root()
+        top = root.childs.get_real_childs()[0]
+        (mesh, basis, quadrature, equation) = top.childs.get_real_childs()
+        mesh_settings = mesh.settings_dict
+        src_generated = str(example)
+        self.assertEqual(src_generated[basis.src_start:basis.src_end], "BasisFunction::LagrangeOfOrder<\n      1\n    >")
+
+        src_changed = src_generated[:basis.src_start] + "BasisFunction::LagrangeOfOrder<2>" + src_generated[basis.src_end:]
+        rets = example.parse_cpp_src_incremental(src_changed, validate_semantics=True)
+        self.assertIsInstance(rets[0], Info)
+        self.assertIs(example.undo_stack.get_current_root(), root)
+        self.assertIs(top.childs.get_real_childs()[0], mesh)
+        self.assertIs(top.childs.get_real_childs()[2], quadrature)
+        self.assertIs(mesh.settings_dict, mesh_settings)
+        self.assertEqual(top.childs.get_real_childs()[1].childs.get_real_childs()[0].name, "2")
+        self.assertEqual(src_changed[quadrature.src_start:quadrature.src_end], "Quadrature::Gauss<\n      2\n    >")
+        # the same as parsing everything again
+        example_full = CPPTree()
+        example_full.load_empty_simulation()
+        example_full.parse_cpp_src(src_changed)
+        self.assertEqual(example_full.undo_stack.get_current_root().compare_cpp(root), True)
+        # the old tree is still on the UndoStack
+        example.undo_stack.undo()
+        self.assertEqual(example.undo_stack.get_current_root().childs.get_real_childs()[0].childs.get_real_childs()[1].childs.get_real_childs()[0].name, "1")
+
+        # a change outside of the problem needs the whole source
+        self.assertEqual(example.parse_cpp_src_incremental(str(example).replace("int main", "int  main")), None)
+
+    # a deleted or added > changes which template_arguments belong to a node, the incremental parse must not keep the old nodes
+    def test_parse_incremental_brackets(self):
+        src = """int main(int argc, char *argv[])
+{
+  DihuContext settings(argc, argv);
+  Control::Coupling<
+    TimeSteppingScheme::Heun<CellmlAdapter<4, 9>>,
+    TimeSteppingScheme::Heun<CellmlAdapter<4, 9>>
+  > problem(settings);
+}
+"""
+        for added in (False, True):
+            example = CPPTree()
+            example.load_empty_simulation()
+            example.parse_cpp_src(src)
+            src_generated = str(example)
+            heun = example.undo_stack.get_current_root().childs.get_real_childs()[0].childs.get_real_childs()[0]
+            self.assertEqual(src_generated[heun.src_end - 1], '>')
+            if added:
+                src_changed = src_generated[:heun.src_end] + '>' + src_generated[heun.src_end:]
+            else:
+                src_changed = src_generated[:heun.src_end - 1] + src_generated[heun.src_end:]
+            # the source of the first Heun is no single node anymore, so everything has to be parsed again
+            self.assertEqual(example.parse_cpp_src_incremental(src_changed), None)
+            rets = example.parse_cpp_src(src_changed)
+            example_full = CPPTree()
+            example_full.load_empty_simulation()
+            self.assertEqual([str(message) for message in example_full.parse_cpp_src(src_changed)], [str(message) for message in rets])
+            if isinstance(rets[0], Info):
+                self.assertEqual(example_full.undo_stack.get_current_root().compare_cpp(example.undo_stack.get_current_root()), True)
+
+    def test_replace_node_edits(self):
+        src = """int main(int argc, char *argv[])
+{
+  DihuContext settings(argc, argv);
+  SpatialDiscretization::FiniteElementMethod<
+    Mesh::StructuredRegularFixedOfDimension<1>,
+    BasisFunction::LagrangeOfOrder<1>,
+    Quadrature::Gauss<2>,
+    Equation::Static::Laplace
+  > problem(settings);
+}
+"""
+        example = CPPTree()
+        example.load_empty_simulation()
+        example.parse_cpp_src(src)
+        src_generated = str(example)
+        top = example.undo_stack.get_current_root().childs.get_real_childs()[0]
+        quadrature = top.childs.get_real_childs()[2]
+        (_, replacements) = quadrature.childs.get_real_childs()[0].get_possible_replacements()
+        quadrature_span = (quadrature.src_start, quadrature.src_end)
+        top_start = top.src_start
+        replaced = quadrature.childs.get_real_childs()[0]
+        example.replace_node(replaced, replaced.create_replacement(replacements[0]))
+        example.delete_node(top.childs.get_real_childs()[0])
+        # only the parents of the changed nodes are generated again
+        edits = example.get_cpp_src_edits(src_generated)
+        self.assertEqual([start for (start, _, _) in edits], [quadrature_span[0], top_start])
+        self.assertEqual(edits[0][1], quadrature_span[1])
+        for (start, end, text) in edits:
+            src_generated = src_generated[:start] + text + src_generated[end:]
+        self.assertEqual(src_generated, str(example))
+        # the edits are only returned once and don't fit to another source
+        self.assertEqual(example.get_cpp_src_edits(src_generated), None)
+        example.delete_node(quadrature)
+        self.assertEqual(example.get_cpp_src_edits("int main() {}"), None)
+
+class TestChilds(unittest.TestCase):
+    # the cached tuple of real childs has to change with the childs
+    def test_real_childs_cache(self):
+        combinations = get_catalog()
+        node = Node(combinations)
+        node.name = "Control::Coupling"
+        childs = node.childs
+        self.assertEqual(childs.get_real_childs(), ())
+        self.assertIs(childs.get_real_childs(), childs.get_real_childs())
+        child1 = Node(combinations)
+        child1.name = "TimeSteppingScheme::Heun"
+        child2 = Node(combinations)
+        child2.name = "TimeSteppingScheme::ExplicitEuler"
+        childs.replace_next_placeholder(child1)
+        self.assertEqual(childs.get_real_childs(), (child1,))
+        childs.replace_next_placeholder(child2)
+        self.assertEqual(childs.get_real_childs(), (child1, child2))
+        # more childs than template_arguments (e.g. while parsing invalid sources)
+        child3 = Node(combinations)
+        childs.replace_next_placeholder(child3)
+        self.assertEqual(childs.get_real_childs(), (child1, child2, child3))
+        childs.delete(child1)
+        self.assertEqual(childs.get_real_childs(), (child2, child3))
+        childs.replace(child2, child1)
+        self.assertEqual(childs.get_real_childs(), (child1, child3))
+        childs.clear()
+        self.assertEqual(childs.get_real_childs(), ())
+
+    # compare_cpp() uses the cached cpp_hash, it has to change with every change of the subtree
+    def test_cpp_hash(self):
+        src = """int main(int argc, char *argv[])
+{
+  DihuContext settings(argc, argv);
+  TimeSteppingScheme::Heun<
+    CellmlAdapter<4, 9>
+  > problem(settings);
+}
+"""
+        example = CPPTree()
+        example.load_empty_simulation()
+        example.parse_cpp_src(src)
+        root = example.undo_stack.get_current_root()
+        root_copy = copy.deepcopy(root)
+        self.assertEqual(root.compare_cpp(root_copy), True)
+        cellml = root.childs.get_real_childs()[0].childs.get_real_childs()[0]
+        number = cellml.childs.get_real_childs()[1]
+        number.comment = 'comment'
+        self.assertEqual(root.cpp_hash, None)
+        self.assertEqual(root.compare_cpp(root_copy), False)
+        number.comment = ''
+        self.assertEqual(root.compare_cpp(root_copy), True)
+        cellml.childs.delete(number)
+        self.assertEqual(root.compare_cpp(root_copy), False)
+        cellml.childs.replace_next_placeholder(number)
+        self.assertEqual(root.compare_cpp(root_copy), True)
+        cellml.can_have_childs = False
+        self.assertEqual(root.compare_cpp(root_copy), False)
+
+    def test_slot_index(self):
+        combinations = get_catalog()
+        node = Node(combinations)
+        node.name = "Control::Coupling"
+        child1 = Node(combinations)
+        child1.name = "TimeSteppingScheme::Heun"
+        child2 = Node(combinations)
+        child2.name = "TimeSteppingScheme::ExplicitEuler"
+        child3 = Node(combinations)
+        child3.name = "TimeSteppingScheme::Heun"
+        for child in (child1, child2, child3):
+            node.childs.replace_next_placeholder(child)
+        self.assertEqual([node.childs.get_index(child) for child in node.childs.get_childs()], [0, 1, 2])
+        self.assertEqual(child2.get_contextual_description(), combinations["Control::Coupling"]["template_arguments"][1][0])
+        # the third child does not fit into Control::Coupling
+        self.assertEqual([str(error) for error in child3.validate_cpp_src()], ['Error: Control::Coupling only accepts 2 template_arguments'])
+        node.childs.delete(child1)
+        self.assertEqual(node.childs.get_index(child1), None)
+        self.assertEqual(node.childs.get_index(node.childs.get_childs()[0]), 0)
+        node.childs.replace(child2, child1)
+        self.assertEqual((node.childs.get_index(child1), node.childs.get_index(child2)), (1, None))
+
+    # validate_cpp_src_recursive() only validates the changed nodes and their parents again
+    def test_validation_cache(self):
+        combinations = get_catalog()
+        node = Node(combinations)
+        node.name = "Control::Coupling"
+        child1 = Node(combinations)
+        child1.name = "TimeSteppingScheme::Heun"
+        child2 = Node(combinations)
+        child2.name = "TimeSteppingScheme::ExplicitEuler"
+        for child in (child1, child2):
+            node.childs.replace_next_placeholder(child)
+        errors = [str(error) for error in node.validate_cpp_src_recursive()]
+        self.assertEqual(errors[0], 'Error: TimeSteppingScheme::Heun needs at least 1 template_arguments but only 0 template_arguments given')
+        self.assertEqual(len(errors), 2)
+        self.assertEqual((child1.validation_errors != None, child2.validation_errors != None), (True, True))
+        child2_errors = child2.validation_errors
+        child1.name = "Integer"
+        self.assertEqual((node.validation_errors, child1.validation_errors), (None, None))
+        self.assertIs(child2.validation_errors, child2_errors)
+        errors = [str(error) for error in node.validate_cpp_src_recursive()]
+        self.assertEqual(errors[0], 'Error: Integer is not in the list of possible template_arguments for Control::Coupling\npossible template_arguments are: ' + str(list(combinations["Control::Coupling"]["template_arguments"][0][1])))
+        self.assertEqual(len(errors), 2)
+        node.childs.delete(child1)
+        self.assertEqual(node.validation_errors, None)
+        self.assertEqual(len(node.validate_cpp_src_recursive()), 2)
+        # validate_cpp_src() returns a new list every time
+        errors = child2.validate_cpp_src()
+        errors.append(None)
+        self.assertEqual(child2.validate_cpp_src(), [])
+
+
+class TestTreeWalk(unittest.TestCase):
+    # repr, validation and cpp_hash walk the tree iteratively and work for trees deeper than the recursion limit
+    def test_deep_tree(self):
+        combinations = get_catalog()
+        depth = sys.getrecursionlimit() + 100
+        roots = []
+        innermost = []
+        for _ in range(2):
+            root = Node(combinations)
+            root.name = "Control::MultipleInstances"
+            node = root
+            for _ in range(depth):
+                child = Node(combinations)
+                child.name = "Control::MultipleInstances"
+                node.childs.replace_next_placeholder(child)
+                node = child
+            roots.append(root)
+            innermost.append(node)
+        src = roots[0].repr_recursive(0, 0)
+        self.assertEqual(src.count('Control::MultipleInstances'), depth + 1)
+        self.assertEqual(src[innermost[0].src_start:innermost[0].src_end], 'Control::MultipleInstances')
+        self.assertEqual(src[roots[0].src_start:roots[0].src_end], src)
+        # only the innermost node misses its template_argument
+        self.assertEqual(len(roots[0].validate_cpp_src_recursive()), 1)
+        self.assertTrue(roots[0].compare_cpp(roots[1]))
+        innermost[0].comment = 'changed'
+        self.assertFalse(roots[1].compare_cpp(roots[0]))
+
+    def test_deep_settings(self):
+        depth = sys.getrecursionlimit() + 100
+        settings = SettingsDict()
+        settings_dict = settings
+        for _ in range(depth):
+            entry = SettingsDictEntry('a', SettingsDict())
+            settings_dict.append(entry)
+            settings_dict = entry.value
+        src = str(settings)
+        self.assertEqual(src.count('"a" : {'), depth)
+        self.assertEqual(src.splitlines()[-1], '}')
+
 class TestPythonParser(unittest.TestCase):
     def test_default_python_settings_syntax(self):
         example = CPPTree()
@@ -188,6 +515,373 @@ class TestPythonParser(unittest.TestCase):
             python_options_str_2 = str(python_options_dict_2)
             #print(python_options_str_2)
 
+    # the settings classes use __slots__ and their own __deepcopy__
+    def test_settings_deepcopy(self):
+        settings = SettingsDict('{\n  "a": 1,  # comment\n  "b": [1, 2],\n  "c": {"d": "e"},\n}')
+        settings[1].value.parent = settings[1]
+        settings[2].default_comment = '# default'
+        self.assertEqual(hasattr(settings, '__dict__') or hasattr(settings[0], '__dict__'), False)
+        settings_copy = copy.deepcopy(settings)
+        self.assertEqual(str(settings_copy), str(settings))
+        self.assertIsNot(settings_copy[2].value, settings[2].value)
+        self.assertIs(settings_copy[1].value.parent, settings_copy[1])
+        self.assertEqual(settings_copy[2].default_comment, '# default')
+        self.assertEqual(hasattr(settings_copy[0], 'default_comment'), False)
+
+    # the values are sliced from the source between their first and last token
+    def test_settings_values(self):
+        settings = SettingsDict('{\n  "a": 1,  # comment\n  "b":   foo(1,  "x, y")  ,\n  "c": [1.5, -2e3, [3]],\n  "d": [2] if x > 1 else [3],\n  "e": (1 +\n        2),\n}')
+        self.assertEqual(settings.get_value('"a"'), '1')
+        self.assertEqual(settings.get_value('"b"'), 'foo(1,  "x, y")')
+        self.assertEqual([entry.value for entry in settings.get_value('"c"')[:2]], ['1.5', '-2e3'])
+        self.assertEqual((settings.get_value('"d"').condition, settings.get_value('"d"').else_block[0].value), ('x > 1', '3'))
+        # only the last line of values that span multiple lines is kept
+        self.assertEqual(settings.get_value('"e"'), '2)')
+
+    # has_key(), get_value() and get_entry() use the key_index, it has to follow the changes of the dict
+    def test_settings_key_index(self):
+        settings = SettingsDict('{\n  "a": 1,\n  "b": 2,\n  "a": 3,\n}')
+        self.assertEqual((settings.get_value('"a"'), settings.get_value('"b"'), settings.has_key('"c"')), ('1', '2', False))
+        settings.append(SettingsDictEntry('c', '4'))
+        self.assertEqual(settings.get_value('"c"'), '4')
+        settings.insert(0, SettingsDictEntry('a', '5'))
+        self.assertEqual(settings.get_value('"a"'), '5')
+        settings.pop(0)
+        settings.remove(settings.get_entry('"b"'))
+        self.assertEqual((settings.get_value('"a"'), settings.has_key('"b"')), ('1', False))
+        settings.get_entry('"a"').key = '"d"'
+        self.assertEqual((settings.get_value('"a"'), settings.get_value('"d"')), ('3', '1'))
+        # the entries in the if_block of a SettingsConditional come after the own entries
+        conditional = SettingsConditional()
+        conditional.if_block = SettingsDict([SettingsDictEntry('e', '6'), SettingsDictEntry('c', '7')])
+        settings.append(conditional)
+        self.assertEqual((settings.get_value('"e"'), settings.get_value('"c"')), ('6', '4'))
+        # the copies build their own key_index
+        for settings_copy in (copy.deepcopy(settings), pickle.loads(pickle.dumps(settings))):
+            self.assertEqual(getattr(settings_copy, 'key_index', None), None)
+            self.assertEqual(settings_copy.get_value('"c"'), '4')
+            self.assertIsNot(settings_copy.get_entry('"c"'), settings.get_entry('"c"'))
+
+    # the key_index is not used after a key got changed or an if_block got changed after it was created
+    def test_settings_key_index_changes(self):
+        settings = SettingsDict('{\n  "a": 1,\n  "b": 2,\n}')
+        self.assertEqual(settings.get_value('"b"'), '2')
+        # the new key is looked up first
+        settings.get_entry('"a"').key = '"z"'
+        self.assertEqual((settings.get_value('"z"'), settings.has_key('"z"'), settings.has_key('"a"')), ('1', True, False))
+        conditional = SettingsConditional()
+        conditional.if_block = SettingsDict([SettingsDictEntry('e', '3')])
+        settings.append(conditional)
+        self.assertEqual((settings.get_value('"e"'), settings.has_key('"f"')), ('3', False))
+        conditional.if_block.append(SettingsDictEntry('f', '4'))
+        conditional.if_block.pop(0)
+        self.assertEqual((settings.get_value('"f"'), settings.has_key('"e"')), ('4', False))
+        conditional.if_block[0].key = '"g"'
+        self.assertEqual((settings.get_value('"g"'), settings.has_key('"f"')), ('4', False))
+        # setting the key of a new entry is no change, the key_index of the dict with the keyless entry is not kept
+        key_changes = SettingsDictEntry.key_changes
+        settings.append(SettingsDictEntry())
+        self.assertEqual(settings.has_key('"h"'), False)
+        settings[-1].key = '"h"'
+        self.assertEqual((settings.get_value('"z"'), settings.has_key('"h"'), SettingsDictEntry.key_changes), ('1', True, key_changes))
+
+    # large lists and dicts are kept as their source until they get parsed
+    def test_settings_unparsed_containers(self):
+        unparsed_min_entries = SettingsDict.unparsed_min_entries
+        SettingsDict.unparsed_min_entries = 3
+        try:
+            positions = '[[0.0, 1.0], [1.0, 1.0],\n  [2.0, 1.0],\n]'
+            settings = SettingsDict('{\n  "a": ' + positions + ',  # comment\n  "b": [1, 2],\n  "c": {"d": ' + positions + '},\n  "e": foo([1, 2, 3]),\n}')
+            unparsed = settings.get_value('"a"')
+            self.assertIsInstance(unparsed, SettingsUnparsedContainer)
+            self.assertEqual((unparsed.src, unparsed.entries, unparsed.get_summary()), (positions, 3, '[.. 3 entries ..]'))
+            self.assertEqual(settings[0].comments, ['# comment'])
+            self.assertIsInstance(settings.get_value('"b"'), SettingsList)
+            self.assertIsInstance(settings.get_value('"c"').get_value('"d"'), SettingsUnparsedContainer)
+            self.assertEqual(settings.get_value('"e"'), 'foo([1, 2, 3])')
+            self.assertIn(positions, str(settings))
+            # the copies share it, it can't be changed
+            self.assertIs(copy.deepcopy(settings).get_value('"a"'), unparsed)
+            parsed = unparsed.parse()
+            self.assertIsInstance(parsed, SettingsList)
+            self.assertEqual([entry.value[0] for entry in parsed], ['0.0', '1.0', '2.0'])
+            # the large lists and dicts in it stay unparsed
+            unparsed = SettingsDict('{"Meshes": {"mesh0": ' + positions + ', "mesh1": [], "mesh2": {}}}').get_value('"Meshes"')
+            self.assertEqual(unparsed.get_summary(), '{.. 3 entries ..}')
+            self.assertIsInstance(unparsed.parse().get_value('"mesh0"'), SettingsUnparsedContainer)
+            # a large list in a value that is more than the list (e.g. the colon of a lambda) keeps its source
+            settings = SettingsDict('{\n  "f": lambda x: ' + positions + ',\n  "g": [lambda x: {"a": 1, "b": 2, "c": 3}],\n}')
+            self.assertEqual(settings.get_value('"f"'), 'lambda x: ' + positions)
+            self.assertEqual(settings.get_value('"g"')[0].value, 'lambda x: {"a": 1, "b": 2, "c": 3}')
+            self.assertNotIn('__unparsed_container_', str(settings))
+        finally:
+            SettingsDict.unparsed_min_entries = unparsed_min_entries
+
+    # lists that only contain numbers are stored in an array, they have to be written like they were parsed
+    def test_settings_numeric_lists(self):
+        src = '{\n  "a": [1, -2, 30],\n  "b": [0.5, 1e-05, -1.0],\n  "c": [0.50, 1.25],\n  "d": [[0.0, 1.0], [2.0, 3.0]],\n  "e": [1, 2.0],\n  "f": [1, 2  # comment\n  ],\n  "g": [0x10, 1_000],\n}'
+        settings = SettingsDict(src, compact_numeric_lists=True)
+        self.assertEqual(str(settings), str(SettingsDict(src)))
+        self.assertEqual([settings.get_value(key).format for key in ('"a"', '"b"', '"c"')], ['int', 'repr', '.2f'])
+        self.assertEqual((list(settings.get_value('"a"')), settings.get_value('"b"')[1], settings.get_value('"c"').values[1]), (['1', '-2', '30'], '1e-05', 1.25))
+        self.assertIsInstance(settings.get_value('"d"')[1].value, SettingsNumericList)
+        for key in ('"e"', '"f"', '"g"'):
+            self.assertIsInstance(settings.get_value(key), SettingsList)
+        # the copies share it, it can't be changed
+        self.assertIs(copy.deepcopy(settings).get_value('"a"'), settings.get_value('"a"'))
+        self.assertEqual(str(pickle.loads(pickle.dumps(settings))), str(settings))
+        parsed = settings.get_value('"b"').parse()
+        self.assertIsInstance(parsed, SettingsList)
+        self.assertEqual([entry.value for entry in parsed], ['0.5', '1e-05', '-1.0'])
+
+    # the settings of the whole tree and of a node are parsed the same way, activating the defaults keeps the compact values
+    def test_parse_python_settings_numeric_lists(self):
+        src = """int main(int argc, char *argv[])
+{
+  DihuContext settings(argc, argv);
+  TimeSteppingScheme::Heun<
+    CellmlAdapter<4, 9>
+  > problem(settings);
+}
+"""
+        example = CPPTree()
+        example.load_empty_simulation()
+        example.parse_cpp_src(src)
+        example.parse_python_settings('config = {\n  "connectedSlots": [1, 2, 3],\n}\n')
+        self.assertIsInstance(example.undo_stack.get_current_root().settings_dict.get_value('"connectedSlots"'), SettingsNumericList)
+        example.parse_python_settings('{\n  "connectedSlots": [4, 5, 6],\n}', example.undo_stack.get_current_root())
+        self.assertIsInstance(example.undo_stack.get_current_root().settings_dict.get_value('"connectedSlots"'), SettingsNumericList)
+        self.assertIsInstance(example.activate_all_default_python_settings(), Info)
+        self.assertEqual(list(example.undo_stack.get_current_root().settings_dict.get_value('"connectedSlots"')), ['4', '5', '6'])
+
+    # write() gives the same text as repr() to files, io.StringIO and functions
+    def test_settings_write(self):
+        python_settings = PythonSettings('import sys\n\nconfig = {\n  "a": [1, 2],  # comment\n  "b": {"c": "d", "e": [[0.5, 1.5]]},\n}\n# end\n')
+        text = str(python_settings)
+        self.assertEqual(text, python_settings.prefix + '\nconfig = ' + str(python_settings.config_dict) + python_settings.postfix)
+        sink = io.StringIO()
+        python_settings.write(sink)
+        self.assertEqual(sink.getvalue(), text)
+        chunks = []
+        write_repr(python_settings.config_dict, chunks.append, chunk_size=10)
+        self.assertEqual(''.join(chunks), str(python_settings.config_dict))
+        self.assertGreater(len(chunks), 1)
+        chunks = []
+        python_settings.config_dict.get_value('"b"').write(chunks.append, depth=1)
+        self.assertEqual(''.join(chunks), python_settings.config_dict.get_value('"b"').repr(1))
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'settings.py')
+            with open(path, 'w') as file:
+                python_settings.write(file)
+            with open(path) as file:
+                self.assertEqual(file.read(), text)
+
+
+class TestCatalog(unittest.TestCase):
+    # the catalog loaded from the on-disk cache has to be the same as the one it was created from
+    def test_catalog_cache(self):
+        combinations = get_catalog()
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, 'catalog.pickle')
+        write_catalog_cache(path, build_catalog_data())
+        cached_combinations = Catalog(read_catalog_cache(path))
+        self.assertEqual(list(cached_combinations.keys()), list(combinations.keys()))
+        for key, value in combinations.items():
+            self.assertEqual(cached_combinations[key].get("template_arguments"), value.get("template_arguments"), msg=key)
+            if "python_options" in value:
+                self.assertEqual(str(cached_combinations[key]["python_options"]), str(value["python_options"]), msg=key)
+
+    # the namespace trie has to return the same keys (in the same order) as scanning all keys with startswith
+    def test_catalog_index_namespace(self):
+        combinations = get_catalog()
+        catalog_index = CatalogIndex(combinations)
+        for namespace in ["Mesh::", "Equation::", "Equation::Static::", "TimeSteppingScheme::", "Unknown::"]:
+            keys = [key for key in combinations.keys() if key.startswith(namespace)]
+            self.assertEqual(list(catalog_index.get_keys_with_namespace(namespace)), keys, msg=namespace)
+
+    # all CPPTrees share one frozen catalog, also through the deepcopys of the UndoStack
+    def test_catalog_shared(self):
+        example1 = CPPTree()
+        example1.load_empty_simulation()
+        example2 = CPPTree()
+        self.assertIs(example1.combinations, example2.combinations)
+        root_copy = copy.deepcopy(example1.undo_stack.get_current_root())
+        self.assertIs(root_copy.combinations, example1.combinations)
+        with self.assertRaises(TypeError):
+            example1.combinations["GLOBAL"]["template_arguments"] = []
+        with self.assertRaises(TypeError):
+            example1.combinations.templates["GLOBAL"] = None
+        self.assertEqual(hasattr(example1.combinations["GLOBAL"], "template"), False)
+
+    def test_catalog_parents(self):
+        catalog = get_catalog()
+        # compare the reverse index with a scan over all template_arguments
+        for name in ["CellmlAdapter", "Mesh::StructuredDeformableOfDimension", "Integer", "GLOBAL"]:
+            parents = []
+            for key, template in catalog.items():
+                for i, (description, names) in enumerate(template.get("template_arguments", ())):
+                    if name in names:
+                        parents.append((key, i, description))
+            self.assertEqual(list(CPPTree().get_template_parents(name)), parents)
+        self.assertEqual(catalog.accepts("GLOBAL", 0, "Control::MultipleInstances"), True)
+        self.assertEqual(catalog.accepts("GLOBAL", 1, "Control::MultipleInstances"), False)
+
+    # the replacement candidates of a slot are created once and a Node only for the picked one
+    def test_catalog_replacements(self):
+        catalog = get_catalog()
+        root = Node(catalog)
+        root.name = "Control::MultipleInstances"
+        node = Node(catalog)
+        node.name = "TimeSteppingScheme::Heun"
+        root.childs.replace_next_placeholder(node)
+        (description, candidates) = node.get_possible_replacements()
+        self.assertEqual(description, catalog["Control::MultipleInstances"]["template_arguments"][0][0])
+        self.assertEqual([c.name for c in candidates], list(catalog["Control::MultipleInstances"]["template_arguments"][0][1]))
+        self.assertIs(node.get_possible_replacements()[1], candidates)
+        for candidate in candidates:
+            self.assertEqual(candidate.can_have_childs, "template_arguments" in catalog.get(candidate.name, {}))
+        replacement = node.create_replacement(candidates[0])
+        self.assertEqual((replacement.name, replacement.can_have_childs), candidates[0])
+        self.assertIsNot(node.create_replacement(candidates[0]), replacement)
+
+    def test_catalog_reachability(self):
+        catalog = get_catalog()
+        reachability = catalog.reachability
+        # compare the closure with a depth first search over the template_arguments
+        for key in catalog:
+            reachable = set()
+            stack = [key]
+            while stack:
+                template = catalog.get(stack.pop())
+                if template == None:
+                    continue
+                for (_description, names) in template.get("template_arguments", ()):
+                    for name in names:
+                        if name in catalog and not name in reachable:
+                            reachable.add(name)
+                            stack.append(name)
+            self.assertEqual(set(reachability.get_keys(reachability.get_reachable_mask(key))), reachable)
+        mesh_mask = reachability.get_namespace_mask("Mesh::")
+        self.assertEqual(reachability.slot_can_reach("GLOBAL", 0, mesh_mask), True)
+        self.assertEqual(reachability.can_reach("Mesh::StructuredRegularFixedOfDimension", mesh_mask), False)
+        self.assertEqual(reachability.get_min_completion_depth("Integer"), 0)
+        self.assertEqual(reachability.get_min_completion_depth("GLOBAL"), 1)
+
+    # python_options only get parsed for the templates that are used
+    def test_catalog_lazy_python_options(self):
+        catalog = Catalog(load_catalog_data())
+        self.assertEqual(any(template.python_options_fixed for template in catalog.values() if "python_options" in template), False)
+        node = Node(catalog)
+        node.name = "TimeSteppingScheme::ExplicitEuler"
+        python_options = node.get_default_python_settings_dict()
+        self.assertIs(python_options, node.get_default_python_settings_dict())
+        # '{}' got replaced by a SettingsDict
+        self.assertIsInstance(python_options.get_value('"ExplicitEuler"').get_value('"dirichletBoundaryConditions"'), SettingsDict)
+        self.assertEqual([key for key, template in catalog.items() if template.python_options_fixed and "python_options" in template], [node.name])
+        # they are shared, so they are read-only, their copies can be changed
+        entry = python_options.get_entry('"ExplicitEuler"')
+        for change in (lambda: python_options.append(SettingsDictEntry('a', '1')), lambda: python_options.pop(), lambda: setattr(entry, 'value', '1'), lambda: entry.value.clear()):
+            self.assertRaises(TypeError, change)
+        for python_options_copy in (copy.deepcopy(python_options), pickle.loads(pickle.dumps(python_options))):
+            self.assertEqual(str(python_options_copy), str(python_options))
+            python_options_copy.append(SettingsDictEntry('a', '1'))
+            python_options_copy.get_entry('"ExplicitEuler"').value.clear()
+        self.assertEqual((python_options.has_key('"a"'), len(entry.value) > 0), (False, True))
+
+
+
+class TestParseCache(unittest.TestCase):
+    def test_parse_cache(self):
+        src = """int main(int argc, char *argv[])
+{
+  DihuContext settings(argc, argv);
+  TimeSteppingScheme::Heun<
+    CellmlAdapter<4, 9>
+  > problem(settings);
+}
+"""
+        example = CPPTree()
+        example.load_empty_simulation()
+        example.parse_cpp_src(src)
+        self.assertEqual((example.parse_cache.hits, example.parse_cache.misses), (0, 1))
+        root1 = example.undo_stack.get_current_root()
+        # change the parsed tree, this must not change the cached one
+        root1.childs.get_real_childs()[0].name = "Changed"
+        example.load_empty_simulation()
+        example.parse_cpp_src(src)
+        self.assertEqual((example.parse_cache.hits, example.parse_cache.misses), (1, 1))
+        root2 = example.undo_stack.get_current_root()
+        self.assertEqual(root2.childs.get_real_childs()[0].name, "TimeSteppingScheme::Heun")
+        self.assertIs(root2.combinations, example.combinations)
+
+        # the cache only holds max_entries
+        example.parse_cache.max_entries = 1
+        example.parse_python_settings("config = {}")
+        self.assertEqual(len(example.parse_cache.entries), 1)
+        self.assertEqual(example.parse_cache.get('python', "config = {}").config_dict, SettingsDict())
+
+
+class TestBatch(unittest.TestCase):
+    def test_parse_and_validate_files(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        sources = {
+            'valid.cpp': "int main(int argc, char *argv[])\n{\n  DihuContext settings(argc, argv);\n  TimeSteppingScheme::Heun<\n    CellmlAdapter<4, 9>\n  > problem(settings);\n}\n",
+            'invalid.cpp': "int main(int argc, char *argv[])\n{\n  DihuContext settings(argc, argv);\n  Dummy problem(settings);\n}\n",
+            'syntax_error.cpp': "int main(int argc, char *argv[])\n{\n}\n",
+        }
+        for (name, src) in sources.items():
+            with open(os.path.join(directory, name), 'w') as file:
+                file.write(src)
+        paths = find_cpp_files([directory])
+        self.assertEqual([os.path.basename(path) for path in paths], sorted(sources))
+        results = parse_and_validate_files(paths, jobs=2)
+        self.assertEqual([result['path'] for result in results], paths)
+        self.assertEqual([result['ok'] for result in results], [False, False, True])
+        self.assertEqual(results[0]['validation'][0]['type'], 'Error')
+        self.assertEqual(results[1]['parse'][0]['type'], 'Error')
+        # the same results without a process pool (except for the times)
+        for (result, result_serial) in zip(results, parse_and_validate_files(paths, jobs=1)):
+            del result['times']
+            del result_serial['times']
+            self.assertEqual(result, result_serial)
+
+
+class TestFrequencyIndex(unittest.TestCase):
+    def test_frequency_index(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        src = "int main(int argc, char *argv[])\n{\n  DihuContext settings(argc, argv);\n  SpatialDiscretization::FiniteElementMethod<\n    Mesh::StructuredRegularFixedOfDimension<1>,\n    BasisFunction::LagrangeOfOrder<1>,\n    QUADRATURE,\n    Equation::Static::Laplace\n  > problem(settings);\n}\n"
+        sources = {
+            'a.cpp': src.replace('QUADRATURE', 'Quadrature::Gauss<2>'),
+            'b.cpp': src.replace('QUADRATURE', 'Quadrature::Gauss<3>'),
+            'c.cpp': src.replace('QUADRATURE', 'Quadrature::NewtonCotes<2>'),
+            # files with Errors are not counted
+            'syntax_error.cpp': "int main(int argc, char *argv[])\n{\n}\n",
+        }
+        for (name, src) in sources.items():
+            with open(os.path.join(directory, name), 'w') as file:
+                file.write(src)
+        frequency_index = build_frequency_index([directory], jobs=1)
+        self.assertEqual((frequency_index['files'], frequency_index['files_counted']), (4, 3))
+        frequencies = frequency_index['frequencies']
+        self.assertEqual(frequencies['SpatialDiscretization::FiniteElementMethod'][2], {'Quadrature::Gauss': 2, 'Quadrature::NewtonCotes': 1})
+        # names that the slot does not accept (the Integers) are not counted
+        self.assertEqual('Quadrature::Gauss' in frequencies, False)
+        # the workers count the same
+        self.assertEqual(build_frequency_index([directory], jobs=2), frequency_index)
+        # the index is stored as json
+        path = os.path.join(directory, 'replacement_frequencies.json')
+        write_frequency_index(path, frequency_index)
+        self.assertEqual(read_frequency_index(path), frequencies)
+        self.assertEqual(read_frequency_index(os.path.join(directory, 'missing.json')), {})
+
+        # the frequencies are fixed when the catalog gets created, the shared catalog is not changed
+        catalog = Catalog(load_catalog_data(), frequencies)
+        (_, candidates) = catalog.get_replacements('SpatialDiscretization::FiniteElementMethod', 2)
+        self.assertEqual([c.name for c in candidates], ['Quadrature::Gauss', 'Quadrature::NewtonCotes', 'Quadrature::None', 'Quadrature::ClenshawCurtis', 'Quadrature::TensorProduct'])
+        self.assertIsNot(get_catalog().get_replacements('SpatialDiscretization::FiniteElementMethod', 2), catalog.get_replacements('SpatialDiscretization::FiniteElementMethod', 2))
 
 
 if __name__ == '__main__':
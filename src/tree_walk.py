@@ -0,0 +1,47 @@
+# iterative traversals of trees (e.g. the Nodes of a CPPTree)
+# they use an explicit stack instead of recursion, so deep trees (e.g. long chains of Coupling, Strang and MultipleInstances)
+# don't need a python stack frame per level and can't hit the recursion limit
+
+# all walkers take get_childs(node), which returns the childs of node (a list or tuple)
+# it gets called after node was yielded, so the caller can still change the childs of node (or return () to skip them)
+
+
+# yields (node, depth) for all nodes below root (including root), parents before their childs
+def walk_preorder(root, get_childs, depth=0):
+    stack = [(root, depth)]
+    while stack:
+        (node, depth) = stack.pop()
+        yield (node, depth)
+        childs = get_childs(node)
+        for i in range(len(childs) - 1, -1, -1):
+            stack.append((childs[i], depth + 1))
+
+
+# yields (node, depth) for all nodes below root (including root), childs before their parents
+def walk_postorder(root, get_childs, depth=0):
+    stack = [(root, depth, False)]
+    while stack:
+        (node, depth, childs_done) = stack.pop()
+        if childs_done:
+            yield (node, depth)
+            continue
+        stack.append((node, depth, True))
+        childs = get_childs(node)
+        for i in range(len(childs) - 1, -1, -1):
+            stack.append((childs[i], depth + 1, False))
+
+
+# yields (node, depth, True) when a node is entered and (node, depth, False) after all its childs were left
+# (e.g. to write the start of a node before its childs and the end of it after them)
+def walk_enter_exit(root, get_childs, depth=0):
+    stack = [(root, depth, False)]
+    while stack:
+        (node, depth, childs_done) = stack.pop()
+        if childs_done:
+            yield (node, depth, False)
+            continue
+        yield (node, depth, True)
+        stack.append((node, depth, True))
+        childs = get_childs(node)
+        for i in range(len(childs) - 1, -1, -1):
+            stack.append((childs[i], depth + 1, False))